@@ -1,2 +1,3 @@
 from .labeling_api import create_labeling_routes
-from .monitoring_api import create_monitoring_routes
\ No newline at end of file
+from .monitoring_api import create_monitoring_routes
+from .app import create_app
\ No newline at end of file
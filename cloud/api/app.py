@@ -0,0 +1,32 @@
+import logging
+from .labeling_api import register_quart_routes as register_labeling_routes
+from .monitoring_api import register_quart_routes as register_monitoring_routes
+logger = logging.getLogger(__name__)
+
+def create_app(data_collector=None, deployment_manager=None, retraining_orchestrator=None, labeling_service=None, database_path: str='./data/training_data.db', models_dir: str='./models'):
+    import asyncio
+    from quart import Quart
+    from ..services import DataCollector, DeploymentManager, LabelingService
+    app = Quart(__name__)
+    owned_collector = data_collector is None
+    if owned_collector:
+        data_collector = DataCollector(database_path=database_path)
+    if deployment_manager is None:
+        deployment_manager = DeploymentManager(models_dir=models_dir, registry_file=f'{models_dir}/registry.json')
+    if labeling_service is None:
+        labeling_service = LabelingService(data_collector)
+    register_labeling_routes(app, labeling_service)
+    register_monitoring_routes(app, data_collector, deployment_manager, retraining_orchestrator, labeling_service)
+
+    @app.before_serving
+    async def startup():
+        if owned_collector:
+            data_collector.start()
+        logger.info('Cloud API started')
+
+    @app.after_serving
+    async def shutdown():
+        if owned_collector:
+            await asyncio.to_thread(data_collector.stop)
+        logger.info('Cloud API stopped')
+    return app
\ No newline at end of file
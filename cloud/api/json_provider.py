@@ -0,0 +1,22 @@
+import logging
+logger = logging.getLogger(__name__)
+
+def install_orjson_provider(app) -> bool:
+    if 'orjson' in app.extensions:
+        return True
+    try:
+        import orjson
+    except ImportError:
+        logger.warning('orjson not installed, falling back to stdlib json. Install with: pip install orjson')
+        return False
+
+    class OrjsonProvider(type(app.json)):
+
+        def dumps(self, obj, **kwargs) -> str:
+            return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+    app.json = OrjsonProvider(app)
+    app.extensions['orjson'] = app.json
+    return True
\ No newline at end of file
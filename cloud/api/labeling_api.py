@@ -1,5 +1,4 @@
 from typing import Dict, Any
-import json
 
 def create_labeling_routes(labeling_service):
 
@@ -61,12 +60,17 @@ def create_labeling_routes(labeling_service):
         distribution = labeling_service.get_label_distribution()
         return {'status': 'ok', 'distribution': distribution}
 
+    def get_available_labels() -> Dict:
+        return {'status': 'ok', 'labels': labeling_service.get_available_labels()}
+
     def export_labels(format: str='json') -> str:
         return labeling_service.export_labeled_data(format)
-    return {'get_next_task': get_next_task, 'get_tasks_batch': get_tasks_batch, 'submit_label': submit_label, 'skip_task': skip_task, 'get_task': get_task, 'get_stats': get_stats, 'get_labeler_stats': get_labeler_stats, 'create_batch': create_batch, 'get_label_distribution': get_label_distribution, 'export_labels': export_labels}
+    return {'get_next_task': get_next_task, 'get_tasks_batch': get_tasks_batch, 'submit_label': submit_label, 'skip_task': skip_task, 'get_task': get_task, 'get_stats': get_stats, 'get_labeler_stats': get_labeler_stats, 'create_batch': create_batch, 'get_label_distribution': get_label_distribution, 'get_available_labels': get_available_labels, 'export_labels': export_labels}
 
 def register_flask_routes(app, labeling_service):
     from flask import request, jsonify
+    from .json_provider import install_orjson_provider
+    install_orjson_provider(app)
     handlers = create_labeling_routes(labeling_service)
 
     @app.route('/api/labeling/next', methods=['GET'])
@@ -102,4 +106,54 @@ def register_flask_routes(app, labeling_service):
 
     @app.route('/api/labeling/distribution', methods=['GET'])
     def distribution():
-        return jsonify(handlers['get_label_distribution']())
\ No newline at end of file
+        return jsonify(handlers['get_label_distribution']())
+
+    @app.route('/api/labeling/labels', methods=['GET'])
+    def labels():
+        return jsonify(handlers['get_available_labels']())
+
+def register_quart_routes(app, labeling_service):
+    import asyncio
+    from quart import request, jsonify
+    from .json_provider import install_orjson_provider
+    install_orjson_provider(app)
+    handlers = create_labeling_routes(labeling_service)
+
+    @app.route('/api/labeling/next', methods=['GET'])
+    async def next_task():
+        labeler_id = request.args.get('labeler_id')
+        return jsonify(await asyncio.to_thread(handlers['get_next_task'], labeler_id))
+
+    @app.route('/api/labeling/batch', methods=['GET'])
+    async def batch_tasks():
+        labeler_id = request.args.get('labeler_id')
+        batch_size = request.args.get('batch_size', 10, type=int)
+        return jsonify(await asyncio.to_thread(handlers['get_tasks_batch'], labeler_id, batch_size))
+
+    @app.route('/api/labeling/submit', methods=['POST'])
+    async def submit():
+        return jsonify(await asyncio.to_thread(handlers['submit_label'], await request.get_json()))
+
+    @app.route('/api/labeling/skip', methods=['POST'])
+    async def skip():
+        return jsonify(await asyncio.to_thread(handlers['skip_task'], await request.get_json()))
+
+    @app.route('/api/labeling/task/<int:task_id>', methods=['GET'])
+    async def task(task_id):
+        return jsonify(await asyncio.to_thread(handlers['get_task'], task_id))
+
+    @app.route('/api/labeling/stats', methods=['GET'])
+    async def stats():
+        return jsonify(await asyncio.to_thread(handlers['get_stats']))
+
+    @app.route('/api/labeling/create-batch', methods=['POST'])
+    async def create_batch():
+        return jsonify(await asyncio.to_thread(handlers['create_batch'], await request.get_json()))
+
+    @app.route('/api/labeling/distribution', methods=['GET'])
+    async def distribution():
+        return jsonify(await asyncio.to_thread(handlers['get_label_distribution']))
+
+    @app.route('/api/labeling/labels', methods=['GET'])
+    async def labels():
+        return jsonify(handlers['get_available_labels']())
\ No newline at end of file
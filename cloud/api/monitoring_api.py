@@ -1,9 +1,34 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Callable
 from datetime import datetime, timedelta
-import json
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+METRICS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+_executor = ThreadPoolExecutor(max_workers=6, thread_name_prefix='monitoring')
 
-def create_monitoring_routes(data_collector, deployment_manager, retraining_orchestrator, labeling_service):
+def ttl_cached(ttl_seconds: float) -> Callable:
 
+    def decorator(func: Callable) -> Callable:
+        lock = threading.Lock()
+        entry = {}
+
+        @functools.wraps(func)
+        def wrapper():
+            with lock:
+                if entry and time.monotonic() - entry['cached_at'] < ttl_seconds:
+                    return entry['value']
+            value = func()
+            with lock:
+                entry['value'] = value
+                entry['cached_at'] = time.monotonic()
+            return value
+        return wrapper
+    return decorator
+
+def create_monitoring_routes(data_collector, deployment_manager, retraining_orchestrator, labeling_service, cache_ttl: float=2.0, alerts_cache_ttl: float=10.0, metrics_cache_ttl: float=5.0):
+
+    @ttl_cached(cache_ttl)
     def get_system_health() -> Dict:
         health = {'status': 'healthy', 'timestamp': datetime.now().isoformat(), 'components': {}}
         try:
@@ -28,34 +53,45 @@ def create_monitoring_routes(data_collector, deployment_manager, retraining_orch
             health['status'] = 'degraded'
         return health
 
+    @ttl_cached(cache_ttl)
     def get_dashboard_summary() -> Dict:
         summary = {'timestamp': datetime.now().isoformat(), 'data': {}, 'models': {}, 'labeling': {}, 'devices': {}}
+        futures = {}
         if data_collector:
-            stats = data_collector.get_stats_summary()
+            futures['data'] = _executor.submit(data_collector.get_stats_summary)
+            futures['total_devices'] = _executor.submit(data_collector.get_total_device_count)
+            futures['active_devices'] = _executor.submit(data_collector.get_active_device_count, timedelta(hours=1))
+        if deployment_manager:
+            futures['production'] = _executor.submit(deployment_manager.get_production_model)
+            futures['versions'] = _executor.submit(deployment_manager.list_versions)
+        if labeling_service:
+            futures['labeling'] = _executor.submit(labeling_service.get_stats)
+        results = {key: future.result() for key, future in futures.items()}
+        if data_collector:
+            stats = results['data']
             summary['data'] = {'total_samples': stats.get('total_samples', 0), 'labeled_samples': stats.get('labeled_samples', 0), 'labeling_rate': stats.get('labeling_rate', 0), 'used_for_training': stats.get('used_for_training', 0)}
         if deployment_manager:
-            prod = deployment_manager.get_production_model()
-            versions = deployment_manager.list_versions()
+            prod = results['production']
+            versions = results['versions']
             summary['models'] = {'production_version': prod['version'] if prod else None, 'production_accuracy': prod['accuracy'] if prod else None, 'total_versions': len(versions), 'versions': [v['version'] for v in versions[:5]]}
         if labeling_service:
-            stats = labeling_service.get_stats()
+            stats = results['labeling']
             summary['labeling'] = {'pending_tasks': stats.get('pending', 0), 'completed_today': stats.get('completed', 0), 'agreement_rate': stats.get('agreement_with_model', 0)}
         if data_collector:
-            device_stats = data_collector.get_device_stats()
-            summary['devices'] = {'total_devices': len(device_stats), 'active_last_hour': sum((1 for d in device_stats if d.last_seen and datetime.now() - d.last_seen < timedelta(hours=1)))}
+            summary['devices'] = {'total_devices': results['total_devices'], 'active_last_hour': results['active_devices']}
         return summary
 
     def get_device_list() -> Dict:
         if not data_collector:
             return {'status': 'ok', 'devices': []}
         device_stats = data_collector.get_device_stats()
+        online_since = time.time() - timedelta(minutes=5).total_seconds()
+        deployments = deployment_manager.get_device_deployment_statuses([d.device_id for d in device_stats]) if deployment_manager else {}
         devices = []
         for d in device_stats:
-            device_info = {'device_id': d.device_id, 'total_samples': d.total_samples, 'labeled_samples': d.labeled_samples, 'last_seen': d.last_seen.isoformat() if d.last_seen else None, 'model_version': d.model_version, 'status': 'online' if d.last_seen and datetime.now() - d.last_seen < timedelta(minutes=5) else 'offline'}
-            if deployment_manager:
-                deploy_status = deployment_manager.get_device_deployment_status(d.device_id)
-                if deploy_status:
-                    device_info['deployment'] = deploy_status
+            device_info = {'device_id': d.device_id, 'total_samples': d.total_samples, 'labeled_samples': d.labeled_samples, 'last_seen': d.last_seen.isoformat() if d.last_seen else None, 'model_version': d.model_version, 'status': 'online' if d.last_seen_ts is not None and d.last_seen_ts > online_since else 'offline'}
+            if d.device_id in deployments:
+                device_info['deployment'] = deployments[d.device_id]
             devices.append(device_info)
         return {'status': 'ok', 'devices': devices}
 
@@ -67,8 +103,7 @@ def create_monitoring_routes(data_collector, deployment_manager, retraining_orch
             return {'status': 'error', 'message': 'Device not found'}
         d = device_stats[0]
         detail = {'device_id': d.device_id, 'total_samples': d.total_samples, 'labeled_samples': d.labeled_samples, 'last_seen': d.last_seen.isoformat() if d.last_seen else None, 'model_version': d.model_version, 'labeling_rate': d.labeled_samples / d.total_samples if d.total_samples > 0 else 0}
-        recent_samples = data_collector.get_unlabeled_samples(limit=10, device_id=device_id)
-        detail['recent_samples'] = len(recent_samples)
+        detail['recent_samples'] = data_collector.get_unlabeled_count(device_id=device_id, limit=10)
         return {'status': 'ok', 'device': detail}
 
     def get_model_list() -> Dict:
@@ -99,14 +134,15 @@ def create_monitoring_routes(data_collector, deployment_manager, retraining_orch
         job_id = retraining_orchestrator.trigger_retraining(trigger)
         return {'status': 'ok', 'job_id': job_id}
 
+    @ttl_cached(alerts_cache_ttl)
     def get_alerts() -> Dict:
         alerts = []
         if deployment_manager:
             prod = deployment_manager.get_production_model()
             if prod and prod.get('deployed_at'):
-                deployed = datetime.fromisoformat(prod['deployed_at'])
-                if datetime.now() - deployed > timedelta(days=30):
-                    alerts.append({'level': 'warning', 'message': f'Production model is {(datetime.now() - deployed).days} days old', 'category': 'model'})
+                model_age = datetime.now() - datetime.fromisoformat(prod['deployed_at'])
+                if model_age > timedelta(days=30):
+                    alerts.append({'level': 'warning', 'message': f'Production model is {model_age.days} days old', 'category': 'model'})
         if labeling_service:
             stats = labeling_service.get_stats()
             if stats.get('pending', 0) > 500:
@@ -118,26 +154,27 @@ def create_monitoring_routes(data_collector, deployment_manager, retraining_orch
                 alerts.append({'level': 'info', 'message': f'{unused} new samples available for training', 'category': 'data'})
         return {'status': 'ok', 'alerts': alerts}
 
-    def get_metrics() -> Dict:
+    @ttl_cached(metrics_cache_ttl)
+    def get_metrics() -> bytes:
         metrics = []
         if data_collector:
             stats = data_collector.get_stats_summary()
-            metrics.append(f"motor_fault_samples_total {stats.get('total_samples', 0)}")
-            metrics.append(f"motor_fault_samples_labeled {stats.get('labeled_samples', 0)}")
-            metrics.append(f"motor_fault_devices_total {stats.get('total_devices', 0)}")
+            metrics.extend((f"motor_fault_samples_total {stats.get('total_samples', 0)}", f"motor_fault_samples_labeled {stats.get('labeled_samples', 0)}", f"motor_fault_devices_total {stats.get('total_devices', 0)}"))
         if deployment_manager:
             prod = deployment_manager.get_production_model()
             if prod:
                 metrics.append(f"motor_fault_model_accuracy {prod.get('accuracy', 0)}")
         if labeling_service:
             stats = labeling_service.get_stats()
-            metrics.append(f"motor_fault_labeling_pending {stats.get('pending', 0)}")
-            metrics.append(f"motor_fault_labeling_completed {stats.get('completed', 0)}")
-        return '\n'.join(metrics)
+            metrics.extend((f"motor_fault_labeling_pending {stats.get('pending', 0)}", f"motor_fault_labeling_completed {stats.get('completed', 0)}"))
+        metrics.append('')
+        return '\n'.join(metrics).encode('utf-8')
     return {'get_system_health': get_system_health, 'get_dashboard_summary': get_dashboard_summary, 'get_device_list': get_device_list, 'get_device_detail': get_device_detail, 'get_model_list': get_model_list, 'get_model_detail': get_model_detail, 'get_retraining_status': get_retraining_status, 'trigger_retraining': trigger_retraining, 'get_alerts': get_alerts, 'get_metrics': get_metrics}
 
 def register_flask_routes(app, data_collector, deployment_manager, retraining_orchestrator, labeling_service):
     from flask import request, jsonify, Response
+    from .json_provider import install_orjson_provider
+    install_orjson_provider(app)
     handlers = create_monitoring_routes(data_collector, deployment_manager, retraining_orchestrator, labeling_service)
 
     @app.route('/api/monitoring/health', methods=['GET'])
@@ -178,4 +215,52 @@ def register_flask_routes(app, data_collector, deployment_manager, retraining_or
 
     @app.route('/api/monitoring/metrics', methods=['GET'])
     def metrics():
-        return Response(handlers['get_metrics'](), mimetype='text/plain')
\ No newline at end of file
+        return Response(handlers['get_metrics'](), content_type=METRICS_CONTENT_TYPE)
+
+def register_quart_routes(app, data_collector, deployment_manager, retraining_orchestrator, labeling_service):
+    import asyncio
+    from quart import request, jsonify, Response
+    from .json_provider import install_orjson_provider
+    install_orjson_provider(app)
+    handlers = create_monitoring_routes(data_collector, deployment_manager, retraining_orchestrator, labeling_service)
+
+    @app.route('/api/monitoring/health', methods=['GET'])
+    async def health():
+        return jsonify(await asyncio.to_thread(handlers['get_system_health']))
+
+    @app.route('/api/monitoring/dashboard', methods=['GET'])
+    async def dashboard():
+        return jsonify(await asyncio.to_thread(handlers['get_dashboard_summary']))
+
+    @app.route('/api/monitoring/devices', methods=['GET'])
+    async def devices():
+        return jsonify(await asyncio.to_thread(handlers['get_device_list']))
+
+    @app.route('/api/monitoring/devices/<device_id>', methods=['GET'])
+    async def device_detail(device_id):
+        return jsonify(await asyncio.to_thread(handlers['get_device_detail'], device_id))
+
+    @app.route('/api/monitoring/models', methods=['GET'])
+    async def models():
+        return jsonify(await asyncio.to_thread(handlers['get_model_list']))
+
+    @app.route('/api/monitoring/models/<version>', methods=['GET'])
+    async def model_detail(version):
+        return jsonify(await asyncio.to_thread(handlers['get_model_detail'], version))
+
+    @app.route('/api/monitoring/retraining', methods=['GET'])
+    async def retraining():
+        return jsonify(await asyncio.to_thread(handlers['get_retraining_status']))
+
+    @app.route('/api/monitoring/retraining/trigger', methods=['POST'])
+    async def trigger():
+        data = await request.get_json(silent=True)
+        return jsonify(await asyncio.to_thread(handlers['trigger_retraining'], data or {}))
+
+    @app.route('/api/monitoring/alerts', methods=['GET'])
+    async def alerts():
+        return jsonify(await asyncio.to_thread(handlers['get_alerts']))
+
+    @app.route('/api/monitoring/metrics', methods=['GET'])
+    async def metrics():
+        return Response(await asyncio.to_thread(handlers['get_metrics']), content_type=METRICS_CONTENT_TYPE)
\ No newline at end of file
@@ -1,15 +1,45 @@
 import json
 import logging
-from datetime import datetime
-from typing import Dict, List, Optional, Any, Callable
-from dataclasses import dataclass, asdict
+import sys
+from array import array
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Any, Callable, Iterator, Sequence
+from dataclasses import dataclass
 from pathlib import Path
 import sqlite3
 import threading
 import queue
+from contextlib import contextmanager
+import time
+from collections import Counter
 logger = logging.getLogger(__name__)
+SQL_INSERT_SAMPLE = 'INSERT INTO samples (device_id, features, predicted_label, confidence, label_source, timestamp, received_at, true_label) VALUES (?, ?, ?, ?, ?, ?, ?, ?)'
+SQL_UPSERT_DEVICE = 'INSERT INTO devices (device_id, total_samples, last_seen) VALUES (?, ?, ?) ON CONFLICT(device_id) DO UPDATE SET total_samples = total_samples + excluded.total_samples, last_seen = excluded.last_seen'
+SQL_SET_LABEL = 'UPDATE samples SET true_label = ? WHERE id = ? RETURNING device_id'
+SQL_INCREMENT_LABELED = 'UPDATE devices SET labeled_samples = labeled_samples + 1 WHERE device_id = ?'
+SQL_MARK_USED = 'UPDATE samples SET used_for_training = 1 WHERE id = ?'
+SQL_UNLABELED_ALL = 'SELECT id, device_id, features, predicted_label, confidence, label_source, timestamp, received_at FROM samples WHERE true_label IS NULL ORDER BY confidence ASC LIMIT ?'
+SQL_UNLABELED_BY_DEVICE = 'SELECT id, device_id, features, predicted_label, confidence, label_source, timestamp, received_at FROM samples WHERE true_label IS NULL AND device_id = ? ORDER BY confidence ASC LIMIT ?'
+SQL_COUNT_DEVICES = 'SELECT COUNT(*) FROM devices'
+SQL_COUNT_ACTIVE_DEVICES = 'SELECT COUNT(*) FROM devices WHERE last_seen >= ?'
+SQL_STATS_SUMMARY = 'SELECT (SELECT COUNT(*) FROM samples), (SELECT COUNT(*) FROM samples WHERE true_label IS NOT NULL), (SELECT COUNT(*) FROM devices), (SELECT COUNT(*) FROM samples WHERE used_for_training = 1)'
 
-@dataclass
+def encode_features(features: List[float]) -> bytes:
+    values = array('f', features)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values.tobytes()
+
+def decode_features(payload) -> List[float]:
+    if isinstance(payload, str):
+        return json.loads(payload)
+    values = array('f')
+    values.frombytes(payload)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values.tolist()
+
+@dataclass(slots=True)
 class TrainingSample:
     device_id: str
     features: List[float]
@@ -22,42 +52,121 @@ class TrainingSample:
     sample_id: Optional[int] = None
 
     def to_dict(self) -> Dict:
-        return asdict(self)
+        return {'device_id': self.device_id, 'features': list(self.features), 'predicted_label': self.predicted_label, 'confidence': self.confidence, 'label_source': self.label_source, 'timestamp': self.timestamp, 'received_at': self.received_at, 'true_label': self.true_label, 'sample_id': self.sample_id}
 
     @classmethod
     def from_dict(cls, data: Dict) -> 'TrainingSample':
-        return cls(device_id=data.get('device_id', ''), features=data.get('features', []), predicted_label=data.get('predicted_label', 0), confidence=data.get('confidence', 0.0), label_source=data.get('label_source', 0), timestamp=data.get('timestamp', 0), received_at=datetime.now(), true_label=data.get('true_label'), sample_id=data.get('sample_id'))
+        get = data.get
+        return cls(get('device_id', ''), get('features', []), get('predicted_label', 0), get('confidence', 0.0), get('label_source', 0), get('timestamp', 0), datetime.now(), get('true_label'), get('sample_id'))
 
-@dataclass
+@dataclass(slots=True)
 class DeviceStats:
     device_id: str
     total_samples: int
     labeled_samples: int
-    last_seen: datetime
+    last_seen_ts: Optional[int]
     model_version: str
 
+    @property
+    def last_seen(self) -> Optional[datetime]:
+        return datetime.fromtimestamp(self.last_seen_ts) if self.last_seen_ts is not None else None
+
+@dataclass(slots=True)
+class TrainingDataset:
+    features: Any
+    labels: Any
+    sample_ids: Any
+
+    def __len__(self) -> int:
+        return len(self.sample_ids)
+
+    def take(self, indices) -> 'TrainingDataset':
+        return TrainingDataset(self.features[indices], self.labels[indices], self.sample_ids[indices])
+
 class DataCollector:
 
-    def __init__(self, database_path: str='./data/training_data.db', buffer_size: int=1000):
+    def __init__(self, database_path: str='./data/training_data.db', buffer_size: int=1000, flush_interval: float=2.0, pool_size: int=4):
         self.database_path = Path(database_path)
         self.database_path.parent.mkdir(parents=True, exist_ok=True)
         self.buffer: List[TrainingSample] = []
         self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self._last_flush = time.monotonic()
         self.buffer_lock = threading.Lock()
         self.sample_queue = queue.Queue()
         self.running = False
         self.worker_thread = None
+        self.pool_size = max(1, pool_size)
+        self._read_pool = queue.LifoQueue()
+        self._read_pool_lock = threading.Lock()
+        self._read_pool_open = 0
+        self._write_lock = threading.Lock()
         self._init_database()
+        self._write_conn = self._connect()
         self.on_sample_received: Optional[Callable] = None
         self.on_batch_stored: Optional[Callable] = None
 
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.database_path), check_same_thread=False, cached_statements=256)
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA mmap_size=268435456')
+        conn.execute('PRAGMA cache_size=-65536')
+        return conn
+
+    @contextmanager
+    def _read_conn(self) -> Iterator[sqlite3.Connection]:
+        try:
+            conn = self._read_pool.get_nowait()
+        except queue.Empty:
+            with self._read_pool_lock:
+                can_open = self._read_pool_open < self.pool_size
+                if can_open:
+                    self._read_pool_open += 1
+            conn = self._connect() if can_open else self._read_pool.get()
+        try:
+            yield conn
+        finally:
+            self._read_pool.put(conn)
+
+    def _iter_rows(self, query: str, params: Sequence) -> Iterator[sqlite3.Row]:
+        with self._read_conn() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = sqlite3.Row
+            rows = cursor.execute(query, params).fetchall()
+        return iter(rows)
+
     def _init_database(self):
         conn = sqlite3.connect(str(self.database_path))
+        conn.execute('PRAGMA journal_mode=WAL')
         cursor = conn.cursor()
-        cursor.execute('\n            CREATE TABLE IF NOT EXISTS samples (\n                id INTEGER PRIMARY KEY AUTOINCREMENT,\n                device_id TEXT NOT NULL,\n                features TEXT NOT NULL,\n                predicted_label INTEGER NOT NULL,\n                confidence REAL NOT NULL,\n                label_source INTEGER NOT NULL,\n                timestamp INTEGER NOT NULL,\n                received_at TEXT NOT NULL,\n                true_label INTEGER,\n                used_for_training INTEGER DEFAULT 0,\n                created_at TEXT DEFAULT CURRENT_TIMESTAMP\n            )\n        ')
-        cursor.execute('\n            CREATE TABLE IF NOT EXISTS devices (\n                device_id TEXT PRIMARY KEY,\n                total_samples INTEGER DEFAULT 0,\n                labeled_samples INTEGER DEFAULT 0,\n                last_seen TEXT,\n                model_version TEXT,\n                created_at TEXT DEFAULT CURRENT_TIMESTAMP\n            )\n        ')
+        devices_ddl = '\n            CREATE TABLE IF NOT EXISTS devices (\n                device_id TEXT PRIMARY KEY,\n                total_samples INTEGER DEFAULT 0,\n                labeled_samples INTEGER DEFAULT 0,\n                last_seen INTEGER,\n                model_version TEXT,\n                created_at TEXT DEFAULT CURRENT_TIMESTAMP\n            )\n        '
+        device_columns = {row[1]: row[2] for row in cursor.execute('PRAGMA table_info(devices)')}
+        migrate_last_seen = device_columns.get('last_seen') == 'TEXT'
+        resume_migration = cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'devices_legacy'").fetchone() is not None
+        if migrate_last_seen or resume_migration:
+            cursor.execute('BEGIN')
+            try:
+                if migrate_last_seen:
+                    cursor.execute('ALTER TABLE devices RENAME TO devices_legacy')
+                cursor.execute(devices_ddl)
+                cursor.execute("\n                INSERT OR REPLACE INTO devices (device_id, total_samples, labeled_samples, last_seen, model_version, created_at)\n                SELECT device_id, total_samples, labeled_samples,\n                       CAST(strftime('%s', last_seen, 'utc') AS INTEGER), model_version, created_at\n                FROM devices_legacy\n            ")
+                cursor.execute('DROP TABLE devices_legacy')
+                conn.commit()
+            except sqlite3.Error:
+                conn.rollback()
+                conn.close()
+                raise
+            logger.info('Migrated devices.last_seen to epoch seconds')
+        cursor.execute('\n            CREATE TABLE IF NOT EXISTS samples (\n                id INTEGER PRIMARY KEY AUTOINCREMENT,\n                device_id TEXT NOT NULL,\n                features BLOB NOT NULL,\n                predicted_label INTEGER NOT NULL,\n                confidence REAL NOT NULL,\n                label_source INTEGER NOT NULL,\n                timestamp INTEGER NOT NULL,\n                received_at TEXT NOT NULL,\n                true_label INTEGER,\n                used_for_training INTEGER DEFAULT 0,\n                created_at TEXT DEFAULT CURRENT_TIMESTAMP\n            )\n        ')
+        cursor.execute(devices_ddl)
         cursor.execute('\n            CREATE INDEX IF NOT EXISTS idx_samples_device\n            ON samples (device_id, received_at)\n        ')
-        cursor.execute('\n            CREATE INDEX IF NOT EXISTS idx_samples_unlabeled\n            ON samples (true_label) WHERE true_label IS NULL\n        ')
+        cursor.execute('DROP INDEX IF EXISTS idx_samples_unlabeled')
+        cursor.execute('\n            CREATE INDEX IF NOT EXISTS idx_samples_unlabeled_conf\n            ON samples (confidence, device_id) WHERE true_label IS NULL\n        ')
+        cursor.execute('\n            CREATE INDEX IF NOT EXISTS idx_samples_unlabeled_device\n            ON samples (device_id, confidence) WHERE true_label IS NULL\n        ')
+        cursor.execute('\n            CREATE INDEX IF NOT EXISTS idx_samples_labeled\n            ON samples (true_label) WHERE true_label IS NOT NULL\n        ')
+        cursor.execute('\n            CREATE INDEX IF NOT EXISTS idx_samples_used\n            ON samples (used_for_training) WHERE used_for_training = 1\n        ')
+        cursor.execute('\n            CREATE INDEX IF NOT EXISTS idx_devices_last_seen\n            ON devices (last_seen)\n        ')
         conn.commit()
         conn.close()
 
@@ -71,20 +180,41 @@ class DataCollector:
         self.running = False
         if self.worker_thread:
             self.worker_thread.join(timeout=5)
-        self._flush_buffer()
+        while True:
+            self._drain_queue()
+            self._flush_buffer()
+            if self.sample_queue.empty():
+                break
+        self.close()
         logger.info('Data collector stopped')
 
+    def close(self):
+        with self._write_lock:
+            self._write_conn.close()
+        with self._read_pool_lock:
+            while self._read_pool_open > 0:
+                self._read_pool.get().close()
+                self._read_pool_open -= 1
+
     def _worker_loop(self):
         while self.running:
             try:
-                while not self.sample_queue.empty():
-                    sample = self.sample_queue.get(timeout=1)
-                    self._add_to_buffer(sample)
+                self._add_to_buffer(self.sample_queue.get(timeout=1.0))
             except queue.Empty:
-                pass
-            if len(self.buffer) >= self.buffer_size:
+                if self.buffer:
+                    self._flush_buffer()
+                continue
+            self._drain_queue()
+            if len(self.buffer) >= self.buffer_size or time.monotonic() - self._last_flush >= self.flush_interval:
                 self._flush_buffer()
 
+    def _drain_queue(self):
+        while len(self.buffer) < self.buffer_size:
+            try:
+                self._add_to_buffer(self.sample_queue.get_nowait())
+            except queue.Empty:
+                break
+
     def receive_sample(self, sample_data: Dict) -> bool:
         try:
             sample = TrainingSample.from_dict(sample_data)
@@ -98,76 +228,87 @@ class DataCollector:
 
     def receive_batch(self, batch_data: Dict) -> int:
         device_id = batch_data.get('device_id', '')
-        samples = batch_data.get('samples', [])
-        count = 0
-        for sample_data in samples:
-            sample_data['device_id'] = device_id
-            if self.receive_sample(sample_data):
-                count += 1
-        logger.info(f'Received {count} samples from {device_id}')
-        return count
+        samples = []
+        for sample_data in batch_data.get('samples', []):
+            try:
+                samples.append(TrainingSample.from_dict({**sample_data, 'device_id': device_id}))
+            except Exception as e:
+                logger.error(f'Error receiving sample: {e}')
+        with self.buffer_lock:
+            self.buffer.extend(samples)
+            need_flush = len(self.buffer) >= self.buffer_size
+        if self.on_sample_received:
+            for sample in samples:
+                self.on_sample_received(sample)
+        if need_flush:
+            self._flush_buffer()
+        logger.info(f'Received {len(samples)} samples from {device_id}')
+        return len(samples)
 
     def _add_to_buffer(self, sample: TrainingSample):
         with self.buffer_lock:
             self.buffer.append(sample)
 
     def _flush_buffer(self):
+        self._last_flush = time.monotonic()
         with self.buffer_lock:
             if not self.buffer:
                 return
             samples_to_store = self.buffer.copy()
             self.buffer.clear()
-        conn = sqlite3.connect(str(self.database_path))
-        cursor = conn.cursor()
+        now = datetime.now()
+        now_iso = now.isoformat()
+        now_ts = int(now.timestamp())
+        rows = [(s.device_id, encode_features(s.features), s.predicted_label, s.confidence, s.label_source, s.timestamp, s.received_at.isoformat() if s.received_at else now_iso, s.true_label) for s in samples_to_store]
+        device_counts = Counter((s.device_id for s in samples_to_store))
         try:
-            for sample in samples_to_store:
-                cursor.execute('\n                    INSERT INTO samples\n                    (device_id, features, predicted_label, confidence,\n                     label_source, timestamp, received_at, true_label)\n                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)\n                ', (sample.device_id, json.dumps(sample.features), sample.predicted_label, sample.confidence, sample.label_source, sample.timestamp, sample.received_at.isoformat() if sample.received_at else datetime.now().isoformat(), sample.true_label))
-                cursor.execute('\n                    INSERT INTO devices (device_id, total_samples, last_seen)\n                    VALUES (?, 1, ?)\n                    ON CONFLICT(device_id) DO UPDATE SET\n                        total_samples = total_samples + 1,\n                        last_seen = excluded.last_seen\n                ', (sample.device_id, datetime.now().isoformat()))
-            conn.commit()
-            logger.info(f'Flushed {len(samples_to_store)} samples to database')
-            if self.on_batch_stored:
-                self.on_batch_stored(len(samples_to_store))
+            with self._write_lock, self._write_conn as conn:
+                conn.executemany(SQL_INSERT_SAMPLE, rows)
+                conn.executemany(SQL_UPSERT_DEVICE, [(device_id, count, now_ts) for device_id, count in device_counts.items()])
         except Exception as e:
             logger.error(f'Error flushing buffer: {e}')
-            conn.rollback()
-        finally:
-            conn.close()
+            return
+        logger.info(f'Flushed {len(samples_to_store)} samples to database')
+        if self.on_batch_stored:
+            self.on_batch_stored(len(samples_to_store))
+
+    def iter_unlabeled_samples(self, limit: int=100, device_id: str=None) -> Iterator[Dict]:
+        if device_id:
+            rows = self._iter_rows(SQL_UNLABELED_BY_DEVICE, (device_id, limit))
+        else:
+            rows = self._iter_rows(SQL_UNLABELED_ALL, (limit,))
+        for row in rows:
+            yield {'sample_id': row['id'], 'device_id': row['device_id'], 'features': decode_features(row['features']), 'predicted_label': row['predicted_label'], 'confidence': row['confidence'], 'label_source': row['label_source'], 'timestamp': row['timestamp'], 'received_at': row['received_at']}
 
     def get_unlabeled_samples(self, limit: int=100, device_id: str=None) -> List[Dict]:
-        conn = sqlite3.connect(str(self.database_path))
-        cursor = conn.cursor()
-        query = '\n            SELECT id, device_id, features, predicted_label, confidence,\n                   label_source, timestamp, received_at\n            FROM samples\n            WHERE true_label IS NULL\n        '
+        return list(self.iter_unlabeled_samples(limit, device_id))
+
+    def get_unlabeled_count(self, device_id: str=None, limit: int=None) -> int:
+        query = 'SELECT 1 FROM samples WHERE true_label IS NULL'
         params = []
         if device_id:
             query += ' AND device_id = ?'
             params.append(device_id)
-        query += ' ORDER BY confidence ASC LIMIT ?'
-        params.append(limit)
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
-        conn.close()
-        samples = []
-        for row in rows:
-            samples.append({'sample_id': row[0], 'device_id': row[1], 'features': json.loads(row[2]), 'predicted_label': row[3], 'confidence': row[4], 'label_source': row[5], 'timestamp': row[6], 'received_at': row[7]})
-        return samples
+        if limit:
+            query += ' LIMIT ?'
+            params.append(limit)
+        with self._read_conn() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'SELECT COUNT(*) FROM ({query})', params)
+            return cursor.fetchone()[0]
 
     def set_label(self, sample_id: int, label: int) -> bool:
-        conn = sqlite3.connect(str(self.database_path))
-        cursor = conn.cursor()
         try:
-            cursor.execute('\n                UPDATE samples SET true_label = ? WHERE id = ?\n            ', (label, sample_id))
-            cursor.execute('\n                UPDATE devices SET labeled_samples = labeled_samples + 1\n                WHERE device_id = (SELECT device_id FROM samples WHERE id = ?)\n            ', (sample_id,))
-            conn.commit()
+            with self._write_lock, self._write_conn as conn:
+                rows = conn.execute(SQL_SET_LABEL, (label, sample_id)).fetchall()
+                if rows:
+                    conn.execute(SQL_INCREMENT_LABELED, (rows[0][0],))
             return True
         except Exception as e:
             logger.error(f'Error setting label: {e}')
             return False
-        finally:
-            conn.close()
 
-    def get_training_dataset(self, min_confidence: float=0.0, labeled_only: bool=True, limit: int=None) -> List[Dict]:
-        conn = sqlite3.connect(str(self.database_path))
-        cursor = conn.cursor()
+    def iter_training_dataset(self, min_confidence: float=0.0, labeled_only: bool=True, limit: int=None) -> Iterator[Dict]:
         query = '\n            SELECT id, device_id, features, predicted_label, confidence,\n                   true_label, used_for_training\n            FROM samples\n            WHERE confidence >= ?\n        '
         params = [min_confidence]
         if labeled_only:
@@ -175,46 +316,67 @@ class DataCollector:
         if limit:
             query += ' LIMIT ?'
             params.append(limit)
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
-        conn.close()
-        samples = []
-        for row in rows:
-            samples.append({'sample_id': row[0], 'device_id': row[1], 'features': json.loads(row[2]), 'predicted_label': row[3], 'confidence': row[4], 'true_label': row[5] if row[5] is not None else row[3], 'used_for_training': bool(row[6])})
-        return samples
+        for row in self._iter_rows(query, params):
+            yield {'sample_id': row['id'], 'device_id': row['device_id'], 'features': decode_features(row['features']), 'predicted_label': row['predicted_label'], 'confidence': row['confidence'], 'true_label': row['true_label'] if row['true_label'] is not None else row['predicted_label'], 'used_for_training': bool(row['used_for_training'])}
 
-    def mark_used_for_training(self, sample_ids: List[int]):
-        conn = sqlite3.connect(str(self.database_path))
-        cursor = conn.cursor()
-        placeholders = ','.join('?' * len(sample_ids))
-        cursor.execute(f'\n            UPDATE samples SET used_for_training = 1\n            WHERE id IN ({placeholders})\n        ', sample_ids)
-        conn.commit()
-        conn.close()
+    def get_training_dataset(self, min_confidence: float=0.0, labeled_only: bool=True, limit: int=None) -> List[Dict]:
+        return list(self.iter_training_dataset(min_confidence, labeled_only, limit))
 
-    def get_device_stats(self, device_id: str=None) -> List[DeviceStats]:
-        conn = sqlite3.connect(str(self.database_path))
-        cursor = conn.cursor()
+    def get_training_arrays(self, min_confidence: float=0.0, labeled_only: bool=True, limit: int=None) -> TrainingDataset:
+        import numpy as np
+        query = 'SELECT id, features, COALESCE(true_label, predicted_label) FROM samples WHERE confidence >= ?'
+        params = [min_confidence]
+        if labeled_only:
+            query += ' AND true_label IS NOT NULL'
+        if limit:
+            query += ' LIMIT ?'
+            params.append(limit)
+        sample_ids = array('q')
+        labels = array('i')
+        blobs = []
+        for row in self._iter_rows(query, params):
+            sample_ids.append(row[0])
+            payload = row[1]
+            blobs.append(encode_features(json.loads(payload)) if isinstance(payload, str) else payload)
+            labels.append(row[2])
+        if not blobs:
+            return TrainingDataset(np.empty((0, 0), dtype=np.float32), np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int64))
+        features = np.frombuffer(b''.join(blobs), dtype='<f4').astype(np.float32, copy=False).reshape(len(blobs), -1)
+        return TrainingDataset(features, np.frombuffer(labels, dtype=np.int32), np.frombuffer(sample_ids, dtype=np.int64))
+
+    def mark_used_for_training(self, sample_ids: Sequence[int]):
+        if len(sample_ids) == 0:
+            return
+        if hasattr(sample_ids, 'tolist'):
+            sample_ids = sample_ids.tolist()
+        with self._write_lock, self._write_conn as conn:
+            conn.executemany(SQL_MARK_USED, ((sample_id,) for sample_id in sample_ids))
+
+    def iter_device_stats(self, device_id: str=None) -> Iterator[DeviceStats]:
+        query = '\n            SELECT device_id, total_samples, labeled_samples,\n                   last_seen, model_version\n            FROM devices\n        '
+        params = []
         if device_id:
-            cursor.execute('\n                SELECT device_id, total_samples, labeled_samples,\n                       last_seen, model_version\n                FROM devices WHERE device_id = ?\n            ', (device_id,))
-        else:
-            cursor.execute('\n                SELECT device_id, total_samples, labeled_samples,\n                       last_seen, model_version\n                FROM devices\n            ')
-        rows = cursor.fetchall()
-        conn.close()
-        stats = []
-        for row in rows:
-            stats.append(DeviceStats(device_id=row[0], total_samples=row[1], labeled_samples=row[2], last_seen=datetime.fromisoformat(row[3]) if row[3] else None, model_version=row[4]))
-        return stats
+            query += ' WHERE device_id = ?'
+            params.append(device_id)
+        for row in self._iter_rows(query, params):
+            yield DeviceStats(device_id=row['device_id'], total_samples=row['total_samples'], labeled_samples=row['labeled_samples'], last_seen_ts=row['last_seen'], model_version=row['model_version'])
+
+    def get_device_stats(self, device_id: str=None) -> List[DeviceStats]:
+        return list(self.iter_device_stats(device_id))
+
+    def get_total_device_count(self) -> int:
+        with self._read_conn() as conn:
+            cursor = conn.cursor()
+            cursor.execute(SQL_COUNT_DEVICES)
+            return cursor.fetchone()[0]
+
+    def get_active_device_count(self, window: timedelta=timedelta(hours=1)) -> int:
+        with self._read_conn() as conn:
+            cursor = conn.cursor()
+            cursor.execute(SQL_COUNT_ACTIVE_DEVICES, (int(time.time() - window.total_seconds()),))
+            return cursor.fetchone()[0]
 
     def get_stats_summary(self) -> Dict:
-        conn = sqlite3.connect(str(self.database_path))
-        cursor = conn.cursor()
-        cursor.execute('SELECT COUNT(*) FROM samples')
-        total_samples = cursor.fetchone()[0]
-        cursor.execute('SELECT COUNT(*) FROM samples WHERE true_label IS NOT NULL')
-        labeled_samples = cursor.fetchone()[0]
-        cursor.execute('SELECT COUNT(DISTINCT device_id) FROM devices')
-        total_devices = cursor.fetchone()[0]
-        cursor.execute('SELECT COUNT(*) FROM samples WHERE used_for_training = 1')
-        used_for_training = cursor.fetchone()[0]
-        conn.close()
+        with self._read_conn() as conn:
+            total_samples, labeled_samples, total_devices, used_for_training = conn.execute(SQL_STATS_SUMMARY).fetchone()
         return {'total_samples': total_samples, 'labeled_samples': labeled_samples, 'unlabeled_samples': total_samples - labeled_samples, 'total_devices': total_devices, 'used_for_training': used_for_training, 'labeling_rate': labeled_samples / total_samples if total_samples > 0 else 0}
\ No newline at end of file
@@ -1,13 +1,72 @@
 import logging
 from datetime import datetime
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass
+from typing import Dict, List, Optional, Any, Tuple
+from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
+from contextlib import contextmanager
 import json
 import shutil
 import hashlib
+import bisect
+import mmap
+import os
+import asyncio
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+try:
+    import orjson
+except ImportError:
+    orjson = None
 logger = logging.getLogger(__name__)
+HASH_CHUNK_SIZE = 1 << 20
+PROBE_SIZE = 1 << 16
+MMAP_HASH_THRESHOLD = 256 << 20
+
+def compute_sha256(path: Path) -> str:
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size >= MMAP_HASH_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if hasattr(mm, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+                return hashlib.sha256(mm).hexdigest()
+        if hasattr(hashlib, 'file_digest'):
+            return hashlib.file_digest(f, 'sha256').hexdigest()
+        h = hashlib.sha256()
+        while (chunk := f.read(HASH_CHUNK_SIZE)):
+            h.update(chunk)
+        return h.hexdigest()
+
+def copy_and_hash(source: Path, dest: Path) -> Tuple[str, int]:
+    if os.path.exists(dest) and os.path.samefile(source, dest):
+        raise shutil.SameFileError(f'{str(source)!r} and {str(dest)!r} are the same file')
+    size = os.stat(source).st_size
+    if size >= MMAP_HASH_THRESHOLD:
+        shutil.copy2(source, dest)
+        return (compute_sha256(dest), size)
+    h = hashlib.sha256()
+    size = 0
+    with open(source, 'rb') as fsrc, open(dest, 'wb') as fdst:
+        while (chunk := fsrc.read(HASH_CHUNK_SIZE)):
+            fdst.write(chunk)
+            h.update(chunk)
+            size += len(chunk)
+    shutil.copystat(source, dest)
+    return (h.hexdigest(), size)
+
+def files_match(a: Path, b: Path, size: int) -> bool:
+    with open(a, 'rb') as fa, open(b, 'rb') as fb:
+        for offset in (0, max(0, size // 2 - PROBE_SIZE // 2)):
+            fa.seek(offset)
+            fb.seek(offset)
+            if fa.read(PROBE_SIZE) != fb.read(PROBE_SIZE):
+                return False
+        fa.seek(0)
+        fb.seek(0)
+        while (chunk := fa.read(HASH_CHUNK_SIZE)):
+            if chunk != fb.read(len(chunk)):
+                return False
+        return not fb.read(1)
 
 class DeploymentStatus(Enum):
     PENDING = 'pending'
@@ -24,7 +83,7 @@ class DeviceUpdateStatus(Enum):
     COMPLETED = 'completed'
     FAILED = 'failed'
 
-@dataclass
+@dataclass(slots=True)
 class DeployedModel:
     version: str
     file_path: str
@@ -35,8 +94,12 @@ class DeployedModel:
     accuracy: float = 0.0
     is_production: bool = False
     metadata: Dict = None
+    created_at_iso: str = field(init=False, repr=False, default='')
+
+    def __post_init__(self):
+        self.created_at_iso = self.created_at.isoformat()
 
-@dataclass
+@dataclass(slots=True)
 class DeviceDeployment:
     device_id: str
     target_version: str
@@ -45,8 +108,12 @@ class DeviceDeployment:
     notified_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
     error_message: str = ''
+    notified_at_iso: Optional[str] = field(init=False, repr=False, default=None)
+
+    def __post_init__(self):
+        self.notified_at_iso = self.notified_at.isoformat() if self.notified_at else None
 
-@dataclass
+@dataclass(slots=True)
 class DeploymentJob:
     deployment_id: str
     model_version: str
@@ -56,6 +123,11 @@ class DeploymentJob:
     completed_at: Optional[datetime] = None
     success_count: int = 0
     failure_count: int = 0
+    pending_count: int = 0
+    created_at_iso: str = field(init=False, repr=False, default='')
+
+    def __post_init__(self):
+        self.created_at_iso = self.created_at.isoformat()
 
 class DeploymentManager:
 
@@ -67,55 +139,111 @@ class DeploymentManager:
         self.production_version: Optional[str] = None
         self.deployments: Dict[str, DeploymentJob] = {}
         self.device_status: Dict[str, DeviceDeployment] = {}
+        self._device_to_deployment: Dict[str, str] = {}
+        self._dirty = False
+        self._batch_depth = 0
+        self._sorted_versions: List[str] = []
+        self._info_cache: Dict[str, Dict] = {}
+        self._size_index: Dict[int, List[str]] = {}
         self._load_registry()
         self.notify_device: Optional[callable] = None
 
     def _load_registry(self):
         if self.registry_file.exists():
-            with open(self.registry_file) as f:
-                data = json.load(f)
+            if orjson is not None:
+                data = orjson.loads(self.registry_file.read_bytes())
+            else:
+                with open(self.registry_file) as f:
+                    data = json.load(f)
             for version, info in data.get('models', {}).items():
                 self.registry[version] = DeployedModel(version=version, file_path=info['file_path'], size_bytes=info['size_bytes'], hash_sha256=info['hash_sha256'], created_at=datetime.fromisoformat(info['created_at']), deployed_at=datetime.fromisoformat(info['deployed_at']) if info.get('deployed_at') else None, accuracy=info.get('accuracy', 0.0), is_production=info.get('is_production', False), metadata=info.get('metadata', {}))
                 if info.get('is_production'):
                     self.production_version = version
+            self._sorted_versions = sorted(self.registry)
+            for version, model in self.registry.items():
+                self._size_index.setdefault(model.size_bytes, []).append(version)
+
+    @contextmanager
+    def batched(self):
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self.flush()
 
     def _save_registry(self):
+        self._dirty = True
+        if self._batch_depth == 0:
+            self.flush()
+
+    def flush(self):
+        if not self._dirty:
+            return
         data = {'models': {}, 'production_version': self.production_version}
         for version, model in self.registry.items():
-            data['models'][version] = {'file_path': model.file_path, 'size_bytes': model.size_bytes, 'hash_sha256': model.hash_sha256, 'created_at': model.created_at.isoformat(), 'deployed_at': model.deployed_at.isoformat() if model.deployed_at else None, 'accuracy': model.accuracy, 'is_production': model.is_production, 'metadata': model.metadata or {}}
-        with open(self.registry_file, 'w') as f:
-            json.dump(data, f, indent=2)
+            data['models'][version] = {'file_path': model.file_path, 'size_bytes': model.size_bytes, 'hash_sha256': model.hash_sha256, 'created_at': model.created_at_iso, 'deployed_at': model.deployed_at.isoformat() if model.deployed_at else None, 'accuracy': model.accuracy, 'is_production': model.is_production, 'metadata': model.metadata or {}}
+        tmp_file = self.registry_file.with_suffix('.tmp')
+        if orjson is not None:
+            tmp_file.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        else:
+            with open(tmp_file, 'w') as f:
+                json.dump(data, f, indent=2)
+        tmp_file.replace(self.registry_file)
+        self._dirty = False
 
     def register_model(self, model_path: str, version: str, accuracy: float=0.0, metadata: Dict=None) -> DeployedModel:
         source_path = Path(model_path)
         if not source_path.exists():
             raise FileNotFoundError(f'Model not found: {model_path}')
         dest_path = self.models_dir / f'model_{version}.tflite'
-        shutil.copy2(source_path, dest_path)
-        with open(dest_path, 'rb') as f:
-            file_hash = hashlib.sha256(f.read()).hexdigest()
-        model = DeployedModel(version=version, file_path=str(dest_path), size_bytes=dest_path.stat().st_size, hash_sha256=file_hash, created_at=datetime.now(), accuracy=accuracy, metadata=metadata)
+        size_bytes = source_path.stat().st_size
+        file_hash = self._find_duplicate_hash(source_path, size_bytes)
+        if file_hash is None:
+            file_hash, size_bytes = copy_and_hash(source_path, dest_path)
+        else:
+            shutil.copy2(source_path, dest_path)
+        model = DeployedModel(version=version, file_path=str(dest_path), size_bytes=size_bytes, hash_sha256=file_hash, created_at=datetime.now(), accuracy=accuracy, metadata=metadata)
+        if version in self.registry:
+            self._size_index[self.registry[version].size_bytes].remove(version)
+        else:
+            bisect.insort(self._sorted_versions, version)
         self.registry[version] = model
+        self._size_index.setdefault(size_bytes, []).append(version)
+        self._info_cache.pop(version, None)
         self._save_registry()
         logger.info(f'Registered model version {version}')
         return model
 
+    def _find_duplicate_hash(self, source_path: Path, size_bytes: int) -> Optional[str]:
+        for version in self._size_index.get(size_bytes, ()):
+            model = self.registry[version]
+            existing = Path(model.file_path)
+            if existing.exists() and files_match(source_path, existing, size_bytes):
+                logger.info(f'Reusing hash of identical model version {version}')
+                return model.hash_sha256
+        return None
+
     def deploy_model(self, version: str, target_devices: List[str]=None) -> str:
         if version not in self.registry:
             raise ValueError(f'Unknown model version: {version}')
         deployment_id = f"deploy_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-        deployment = DeploymentJob(deployment_id=deployment_id, model_version=version, target_devices=target_devices or [], status=DeploymentStatus.PENDING, created_at=datetime.now())
+        deployment = DeploymentJob(deployment_id=deployment_id, model_version=version, target_devices=list(dict.fromkeys(target_devices or [])), status=DeploymentStatus.PENDING, created_at=datetime.now())
         self.deployments[deployment_id] = deployment
-        self._set_production(version)
-        self._start_rollout(deployment)
+        with self.batched():
+            self._set_production(version)
+            self._start_rollout(deployment)
         return deployment_id
 
     def _set_production(self, version: str):
         if self.production_version and self.production_version in self.registry:
             self.registry[self.production_version].is_production = False
+            self._info_cache.pop(self.production_version, None)
         self.registry[version].is_production = True
         self.registry[version].deployed_at = datetime.now()
         self.production_version = version
+        self._info_cache.pop(version, None)
         self._save_registry()
 
     def _start_rollout(self, deployment: DeploymentJob):
@@ -125,14 +253,33 @@ class DeploymentManager:
         if self.notify_device:
             devices = deployment.target_devices or self._get_all_devices()
             for device_id in devices:
-                self._notify_device_update(device_id, update_info)
+                self._detach_device(device_id)
                 self.device_status[device_id] = DeviceDeployment(device_id=device_id, target_version=deployment.model_version, current_version='', status=DeviceUpdateStatus.NOTIFIED, notified_at=datetime.now())
+                self._device_to_deployment[device_id] = deployment.deployment_id
+                deployment.pending_count += 1
+            self._notify_devices(devices, update_info)
         logger.info(f'Started rollout of {deployment.model_version}')
 
-    def _notify_device_update(self, device_id: str, update_info: Dict):
-        if self.notify_device:
+    def _notify_devices(self, devices: List[str], update_info: Dict):
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            asyncio.run(self.notify_devices(devices, update_info))
+            return
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            executor.submit(asyncio.run, self.notify_devices(devices, update_info)).result()
+
+    async def notify_devices(self, devices: List[str], update_info: Dict):
+        await asyncio.gather(*(self._notify_device_update(device_id, update_info) for device_id in devices), return_exceptions=True)
+
+    async def _notify_device_update(self, device_id: str, update_info: Dict):
+        notify = self.notify_device
+        if notify:
             try:
-                self.notify_device(device_id, update_info)
+                if inspect.iscoroutinefunction(notify):
+                    await notify(device_id, update_info)
+                else:
+                    await asyncio.to_thread(notify, device_id, update_info)
             except Exception as e:
                 logger.error(f'Failed to notify {device_id}: {e}')
 
@@ -146,6 +293,7 @@ class DeploymentManager:
         if device_id not in self.device_status:
             return
         device = self.device_status[device_id]
+        previous_status = device.status
         try:
             device.status = DeviceUpdateStatus(status)
         except ValueError:
@@ -156,36 +304,31 @@ class DeploymentManager:
             device.error_message = error
         if device.status == DeviceUpdateStatus.COMPLETED:
             device.completed_at = datetime.now()
-            self._check_deployment_completion()
-        elif device.status == DeviceUpdateStatus.FAILED:
-            self._check_deployment_completion()
-
-    def _check_deployment_completion(self):
-        for deployment in self.deployments.values():
-            if deployment.status != DeploymentStatus.ROLLING_OUT:
-                continue
-            success = 0
-            failure = 0
-            pending = 0
-            devices = deployment.target_devices or self._get_all_devices()
-            for device_id in devices:
-                if device_id in self.device_status:
-                    status = self.device_status[device_id].status
-                    if status == DeviceUpdateStatus.COMPLETED:
-                        success += 1
-                    elif status == DeviceUpdateStatus.FAILED:
-                        failure += 1
-                    else:
-                        pending += 1
-            deployment.success_count = success
-            deployment.failure_count = failure
-            if pending == 0:
-                if failure == 0:
-                    deployment.status = DeploymentStatus.COMPLETED
-                else:
-                    deployment.status = DeploymentStatus.COMPLETED
-                deployment.completed_at = datetime.now()
-                logger.info(f'Deployment {deployment.deployment_id} completed: {success} success, {failure} failed')
+        deployment = self.deployments.get(self._device_to_deployment.get(device_id))
+        if deployment and deployment.status == DeploymentStatus.ROLLING_OUT:
+            self._count_device_status(deployment, previous_status, -1)
+            self._count_device_status(deployment, device.status, 1)
+            self._check_deployment_completion(deployment)
+
+    def _detach_device(self, device_id: str):
+        deployment = self.deployments.get(self._device_to_deployment.pop(device_id, None))
+        if deployment and deployment.status == DeploymentStatus.ROLLING_OUT:
+            self._count_device_status(deployment, self.device_status[device_id].status, -1)
+            self._check_deployment_completion(deployment)
+
+    def _count_device_status(self, deployment: DeploymentJob, status: DeviceUpdateStatus, delta: int):
+        if status == DeviceUpdateStatus.COMPLETED:
+            deployment.success_count += delta
+        elif status == DeviceUpdateStatus.FAILED:
+            deployment.failure_count += delta
+        else:
+            deployment.pending_count += delta
+
+    def _check_deployment_completion(self, deployment: DeploymentJob):
+        if deployment.pending_count == 0:
+            deployment.status = DeploymentStatus.COMPLETED
+            deployment.completed_at = datetime.now()
+            logger.info(f'Deployment {deployment.deployment_id} completed: {deployment.success_count} success, {deployment.failure_count} failed')
 
     def rollback(self, to_version: str=None) -> bool:
         if to_version is None:
@@ -202,10 +345,14 @@ class DeploymentManager:
         return True
 
     def get_model_info(self, version: str) -> Optional[Dict]:
+        info = self._info_cache.get(version)
+        if info is not None:
+            return info
         if version not in self.registry:
             return None
         model = self.registry[version]
-        return {'version': model.version, 'file_path': model.file_path, 'size_bytes': model.size_bytes, 'hash': model.hash_sha256, 'created_at': model.created_at.isoformat(), 'deployed_at': model.deployed_at.isoformat() if model.deployed_at else None, 'accuracy': model.accuracy, 'is_production': model.is_production, 'metadata': model.metadata}
+        info = self._info_cache[version] = {'version': model.version, 'file_path': model.file_path, 'size_bytes': model.size_bytes, 'hash': model.hash_sha256, 'created_at': model.created_at_iso, 'deployed_at': model.deployed_at.isoformat() if model.deployed_at else None, 'accuracy': model.accuracy, 'is_production': model.is_production, 'metadata': model.metadata}
+        return info
 
     def get_production_model(self) -> Optional[Dict]:
         if self.production_version:
@@ -213,16 +360,23 @@ class DeploymentManager:
         return None
 
     def list_versions(self) -> List[Dict]:
-        return [self.get_model_info(v) for v in sorted(self.registry.keys(), reverse=True)]
+        return [self.get_model_info(v) for v in reversed(self._sorted_versions)]
 
     def get_deployment_status(self, deployment_id: str) -> Optional[Dict]:
         if deployment_id not in self.deployments:
             return None
         d = self.deployments[deployment_id]
-        return {'deployment_id': d.deployment_id, 'model_version': d.model_version, 'status': d.status.value, 'created_at': d.created_at.isoformat(), 'completed_at': d.completed_at.isoformat() if d.completed_at else None, 'success_count': d.success_count, 'failure_count': d.failure_count, 'target_devices': d.target_devices}
+        return {'deployment_id': d.deployment_id, 'model_version': d.model_version, 'status': d.status.value, 'created_at': d.created_at_iso, 'completed_at': d.completed_at.isoformat() if d.completed_at else None, 'success_count': d.success_count, 'failure_count': d.failure_count, 'pending_count': d.pending_count, 'target_devices': d.target_devices}
 
     def get_device_deployment_status(self, device_id: str) -> Optional[Dict]:
         if device_id not in self.device_status:
             return None
-        d = self.device_status[device_id]
-        return {'device_id': d.device_id, 'target_version': d.target_version, 'current_version': d.current_version, 'status': d.status.value, 'notified_at': d.notified_at.isoformat() if d.notified_at else None, 'completed_at': d.completed_at.isoformat() if d.completed_at else None, 'error_message': d.error_message}
\ No newline at end of file
+        return self._device_deployment_to_dict(self.device_status[device_id])
+
+    def get_device_deployment_statuses(self, device_ids: List[str]=None) -> Dict[str, Dict]:
+        if device_ids is None:
+            device_ids = list(self.device_status.keys())
+        return {device_id: self._device_deployment_to_dict(self.device_status[device_id]) for device_id in device_ids if device_id in self.device_status}
+
+    def _device_deployment_to_dict(self, d: DeviceDeployment) -> Dict:
+        return {'device_id': d.device_id, 'target_version': d.target_version, 'current_version': d.current_version, 'status': d.status.value, 'notified_at': d.notified_at_iso, 'completed_at': d.completed_at.isoformat() if d.completed_at else None, 'error_message': d.error_message}
\ No newline at end of file
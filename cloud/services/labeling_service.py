@@ -1,10 +1,16 @@
 import logging
 from datetime import datetime
 from typing import Dict, List, Optional, Any, Callable
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
 import json
 from collections import defaultdict
+import heapq
+import operator
+try:
+    import orjson
+except ImportError:
+    orjson = None
 logger = logging.getLogger(__name__)
 
 class LabelingPriority(Enum):
@@ -20,7 +26,7 @@ class LabelingStatus(Enum):
     SKIPPED = 'skipped'
     DISPUTED = 'disputed'
 
-@dataclass
+@dataclass(slots=True)
 class LabelingTask:
     task_id: int
     sample_id: int
@@ -37,8 +43,12 @@ class LabelingTask:
     assigned_label: Optional[int] = None
     labeler_confidence: float = 1.0
     notes: str = ''
+    created_at_iso: str = field(init=False, repr=False, default='')
 
-@dataclass
+    def __post_init__(self):
+        self.created_at_iso = self.created_at.isoformat()
+
+@dataclass(slots=True)
 class LabelingStats:
     total_tasks: int
     pending: int
@@ -48,7 +58,17 @@ class LabelingStats:
     disputed: int
     accuracy_vs_predicted: float
     avg_labeling_time_seconds: float
-FAULT_LABELS = {0: 'Normal', 1: 'Imbalance', 2: 'Misalignment', 3: 'Bearing Fault', 4: 'Looseness'}
+_STATUS_INDEX = {status: i for i, status in enumerate(LabelingStatus)}
+FAULT_LABELS = ('Normal', 'Imbalance', 'Misalignment', 'Bearing Fault', 'Looseness')
+
+def label_name(label, default='Unknown'):
+    try:
+        index = operator.index(label)
+    except TypeError:
+        return default
+    if 0 <= index < len(FAULT_LABELS):
+        return FAULT_LABELS[index]
+    return default
 
 class LabelingService:
 
@@ -56,6 +76,14 @@ class LabelingService:
         self.data_collector = data_collector
         self.tasks: Dict[int, LabelingTask] = {}
         self.task_counter = 0
+        self._active_sample_tasks: Dict[int, int] = {}
+        self._pending_heap: List[tuple] = []
+        self._status_counts: List[int] = [0] * len(LabelingStatus)
+        self._label_counts: Dict[int, int] = defaultdict(int)
+        self._labeled_count = 0
+        self._agreement_count = 0
+        self._total_time = 0.0
+        self._time_count = 0
         self.labeler_stats: Dict[str, Dict] = defaultdict(lambda: {'completed': 0, 'avg_time': 0, 'agreement_rate': 0})
         self.selection_strategy = 'uncertainty'
         self.batch_size = 50
@@ -85,19 +113,18 @@ class LabelingService:
     def _select_diverse(self, samples: List[Dict], num_samples: int) -> List[Dict]:
         if len(samples) <= num_samples:
             return samples
-        sorted_samples = sorted(samples, key=lambda x: x['confidence'])
-        step = len(sorted_samples) / num_samples
-        selected = []
-        for i in range(num_samples):
-            idx = int(i * step)
-            selected.append(sorted_samples[idx])
-        return selected
+        import numpy as np
+        confidences = np.fromiter((s['confidence'] for s in samples), dtype=np.float64, count=len(samples))
+        order = np.argsort(confidences, kind='stable')
+        picks = (np.arange(num_samples) * (len(samples) / num_samples)).astype(np.int64)
+        return [samples[i] for i in order[picks].tolist()]
 
     def _sample_has_task(self, sample_id: int) -> bool:
-        for task in self.tasks.values():
-            if task.sample_id == sample_id and task.status in [LabelingStatus.PENDING, LabelingStatus.IN_PROGRESS]:
-                return True
-        return False
+        return sample_id in self._active_sample_tasks
+
+    def _release_sample(self, task: LabelingTask):
+        if self._active_sample_tasks.get(task.sample_id) == task.task_id:
+            del self._active_sample_tasks[task.sample_id]
 
     def _create_task(self, sample: Dict) -> LabelingTask:
         self.task_counter += 1
@@ -110,65 +137,113 @@ class LabelingService:
             priority = LabelingPriority.LOW
         task = LabelingTask(task_id=self.task_counter, sample_id=sample['sample_id'], device_id=sample.get('device_id', ''), features=sample.get('features', []), predicted_label=sample.get('predicted_label', 0), confidence=confidence, priority=priority, status=LabelingStatus.PENDING, created_at=datetime.now())
         self.tasks[task.task_id] = task
+        self._status_counts[_STATUS_INDEX[LabelingStatus.PENDING]] += 1
+        self._active_sample_tasks[task.sample_id] = task.task_id
+        heapq.heappush(self._pending_heap, (-task.priority.value, task.created_at, task.task_id))
         return task
 
+    def _leave_status(self, task: LabelingTask):
+        self._status_counts[_STATUS_INDEX[task.status]] -= 1
+        if task.status == LabelingStatus.LABELED:
+            self._count_labeled(task, -1)
+
+    def _enter_status(self, task: LabelingTask, status: LabelingStatus):
+        task.status = status
+        self._status_counts[_STATUS_INDEX[status]] += 1
+        if status == LabelingStatus.LABELED:
+            self._count_labeled(task, 1)
+
+    def _count_labeled(self, task: LabelingTask, delta: int):
+        self._labeled_count += delta
+        if task.assigned_at and task.completed_at:
+            self._total_time += delta * (task.completed_at - task.assigned_at).total_seconds()
+            self._time_count += delta
+        if task.assigned_label == task.predicted_label:
+            self._agreement_count += delta
+        if task.assigned_label is not None:
+            self._label_counts[task.assigned_label] += delta
+
+    def _peek_pending(self) -> Optional[LabelingTask]:
+        heap = self._pending_heap
+        while heap:
+            task = self.tasks.get(heap[0][2])
+            if task is not None and task.status == LabelingStatus.PENDING:
+                return task
+            heapq.heappop(heap)
+        return None
+
     def get_next_task(self, labeler_id: str=None) -> Optional[Dict]:
-        pending = [t for t in self.tasks.values() if t.status == LabelingStatus.PENDING]
-        if not pending:
+        task = self._peek_pending()
+        if task is None:
             return None
-        pending.sort(key=lambda t: (-t.priority.value, t.created_at))
-        task = pending[0]
         if labeler_id:
+            heapq.heappop(self._pending_heap)
             task.assigned_to = labeler_id
             task.assigned_at = datetime.now()
-            task.status = LabelingStatus.IN_PROGRESS
+            self._leave_status(task)
+            self._enter_status(task, LabelingStatus.IN_PROGRESS)
         return self._task_to_dict(task)
 
     def get_tasks_batch(self, labeler_id: str=None, batch_size: int=10) -> List[Dict]:
-        tasks = []
-        for _ in range(batch_size):
-            task = self.get_next_task(labeler_id)
-            if task:
-                tasks.append(task)
-            else:
-                break
-        return tasks
+        heap = self._pending_heap
+        if not labeler_id:
+            pending = heapq.nsmallest(batch_size, (entry for entry in heap if self.tasks[entry[2]].status == LabelingStatus.PENDING))
+            return [self._task_to_dict(self.tasks[entry[2]]) for entry in pending]
+        assigned_at = datetime.now()
+        batch = []
+        while heap and len(batch) < batch_size:
+            task = self.tasks.get(heapq.heappop(heap)[2])
+            if task is None or task.status != LabelingStatus.PENDING:
+                continue
+            task.assigned_to = labeler_id
+            task.assigned_at = assigned_at
+            task.status = LabelingStatus.IN_PROGRESS
+            batch.append(task)
+        self._status_counts[_STATUS_INDEX[LabelingStatus.PENDING]] -= len(batch)
+        self._status_counts[_STATUS_INDEX[LabelingStatus.IN_PROGRESS]] += len(batch)
+        return [self._task_to_dict(task) for task in batch]
 
     def submit_label(self, task_id: int, label: int, labeler_id: str=None, confidence: float=1.0, notes: str='') -> bool:
         if task_id not in self.tasks:
             return False
         task = self.tasks[task_id]
+        self._leave_status(task)
         task.assigned_label = label
         task.labeler_confidence = confidence
         task.notes = notes
-        task.status = LabelingStatus.LABELED
         task.completed_at = datetime.now()
         if labeler_id:
             task.assigned_to = labeler_id
+        self._enter_status(task, LabelingStatus.LABELED)
+        self._release_sample(task)
         if self.data_collector:
             self.data_collector.set_label(task.sample_id, label)
         if task.assigned_to:
             self._update_labeler_stats(task)
         if self.on_label_assigned:
             self.on_label_assigned(task)
-        logger.info(f"Task {task_id} labeled as {FAULT_LABELS.get(label, label)} by {labeler_id or 'unknown'}")
+        logger.info(f"Task {task_id} labeled as {label_name(label, label)} by {labeler_id or 'unknown'}")
         return True
 
     def skip_task(self, task_id: int, reason: str='') -> bool:
         if task_id not in self.tasks:
             return False
         task = self.tasks[task_id]
-        task.status = LabelingStatus.SKIPPED
+        self._leave_status(task)
         task.notes = reason
         task.completed_at = datetime.now()
+        self._enter_status(task, LabelingStatus.SKIPPED)
+        self._release_sample(task)
         return True
 
     def dispute_label(self, task_id: int, reason: str) -> bool:
         if task_id not in self.tasks:
             return False
         task = self.tasks[task_id]
-        task.status = LabelingStatus.DISPUTED
+        self._leave_status(task)
         task.notes = reason
+        self._enter_status(task, LabelingStatus.DISPUTED)
+        self._release_sample(task)
         return True
 
     def _update_labeler_stats(self, task: LabelingTask):
@@ -192,24 +267,14 @@ class LabelingService:
         return self._task_to_dict(self.tasks[task_id])
 
     def _task_to_dict(self, task: LabelingTask) -> Dict:
-        return {'task_id': task.task_id, 'sample_id': task.sample_id, 'device_id': task.device_id, 'features': task.features, 'predicted_label': task.predicted_label, 'predicted_label_name': FAULT_LABELS.get(task.predicted_label, 'Unknown'), 'confidence': task.confidence, 'priority': task.priority.name, 'status': task.status.value, 'created_at': task.created_at.isoformat(), 'assigned_to': task.assigned_to, 'assigned_at': task.assigned_at.isoformat() if task.assigned_at else None, 'completed_at': task.completed_at.isoformat() if task.completed_at else None, 'assigned_label': task.assigned_label, 'assigned_label_name': FAULT_LABELS.get(task.assigned_label) if task.assigned_label is not None else None, 'labeler_confidence': task.labeler_confidence, 'notes': task.notes, 'available_labels': FAULT_LABELS}
+        return {'task_id': task.task_id, 'sample_id': task.sample_id, 'device_id': task.device_id, 'features': task.features, 'predicted_label': task.predicted_label, 'predicted_label_name': label_name(task.predicted_label), 'confidence': task.confidence, 'priority': task.priority.name, 'status': task.status.value, 'created_at': task.created_at_iso, 'assigned_to': task.assigned_to, 'assigned_at': task.assigned_at.isoformat() if task.assigned_at else None, 'completed_at': task.completed_at.isoformat() if task.completed_at else None, 'assigned_label': task.assigned_label, 'assigned_label_name': label_name(task.assigned_label, None), 'labeler_confidence': task.labeler_confidence, 'notes': task.notes}
+
+    def get_available_labels(self) -> Dict[int, str]:
+        return dict(enumerate(FAULT_LABELS))
 
     def get_stats(self) -> Dict:
-        status_counts = defaultdict(int)
-        total_time = 0
-        time_count = 0
-        agreement_count = 0
-        labeled_count = 0
-        for task in self.tasks.values():
-            status_counts[task.status.value] += 1
-            if task.status == LabelingStatus.LABELED:
-                labeled_count += 1
-                if task.assigned_at and task.completed_at:
-                    total_time += (task.completed_at - task.assigned_at).total_seconds()
-                    time_count += 1
-                if task.assigned_label == task.predicted_label:
-                    agreement_count += 1
-        return {'total_tasks': len(self.tasks), 'pending': status_counts['pending'], 'in_progress': status_counts['in_progress'], 'completed': status_counts['labeled'], 'skipped': status_counts['skipped'], 'disputed': status_counts['disputed'], 'agreement_with_model': agreement_count / labeled_count if labeled_count > 0 else 0, 'avg_labeling_time_seconds': total_time / time_count if time_count > 0 else 0}
+        counts = self._status_counts
+        return {'total_tasks': len(self.tasks), 'pending': counts[_STATUS_INDEX[LabelingStatus.PENDING]], 'in_progress': counts[_STATUS_INDEX[LabelingStatus.IN_PROGRESS]], 'completed': counts[_STATUS_INDEX[LabelingStatus.LABELED]], 'skipped': counts[_STATUS_INDEX[LabelingStatus.SKIPPED]], 'disputed': counts[_STATUS_INDEX[LabelingStatus.DISPUTED]], 'agreement_with_model': self._agreement_count / self._labeled_count if self._labeled_count > 0 else 0, 'avg_labeling_time_seconds': self._total_time / self._time_count if self._time_count > 0 else 0}
 
     def get_labeler_stats(self, labeler_id: str=None) -> Dict:
         if labeler_id:
@@ -220,6 +285,8 @@ class LabelingService:
         tasks = [t for t in self.tasks.values() if t.status == LabelingStatus.LABELED or (include_skipped and t.status == LabelingStatus.SKIPPED)]
         if format == 'json':
             data = [self._task_to_dict(t) for t in tasks]
+            if orjson is not None:
+                return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode('utf-8')
             return json.dumps(data, indent=2)
         elif format == 'csv':
             lines = ['sample_id,device_id,predicted_label,assigned_label,confidence,labeler_confidence']
@@ -229,9 +296,4 @@ class LabelingService:
         return ''
 
     def get_label_distribution(self) -> Dict[str, int]:
-        distribution = defaultdict(int)
-        for task in self.tasks.values():
-            if task.status == LabelingStatus.LABELED and task.assigned_label is not None:
-                label_name = FAULT_LABELS.get(task.assigned_label, f'Unknown ({task.assigned_label})')
-                distribution[label_name] += 1
-        return dict(distribution)
\ No newline at end of file
+        return {label_name(label, f'Unknown ({label})'): count for label, count in self._label_counts.items() if count > 0}
\ No newline at end of file
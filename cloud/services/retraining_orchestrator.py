@@ -6,6 +6,7 @@ from enum import Enum
 from pathlib import Path
 import json
 import threading
+import queue
 import time
 logger = logging.getLogger(__name__)
 
@@ -56,9 +57,15 @@ class RetrainingOrchestrator:
         self.models_dir.mkdir(parents=True, exist_ok=True)
         self.current_job: Optional[RetrainingJob] = None
         self.job_history: List[RetrainingJob] = []
+        self._job_index: Dict[str, RetrainingJob] = {}
         self.job_lock = threading.Lock()
+        self._trigger_lock = threading.Lock()
+        self._idle = threading.Event()
+        self._idle.set()
         self.running = False
         self.worker_thread = None
+        self._job_queue: queue.Queue = queue.Queue()
+        self._job_worker: Optional[threading.Thread] = None
         self.production_accuracy = 0.0
         self.on_job_started: Optional[Callable] = None
         self.on_job_completed: Optional[Callable] = None
@@ -75,6 +82,12 @@ class RetrainingOrchestrator:
         self.running = False
         if self.worker_thread:
             self.worker_thread.join(timeout=10)
+        with self.job_lock:
+            job_worker = self._job_worker
+            self._job_worker = None
+        if job_worker:
+            self._job_queue.put(None)
+            job_worker.join(timeout=10)
         logger.info('Retraining orchestrator stopped')
 
     def _worker_loop(self):
@@ -87,7 +100,7 @@ class RetrainingOrchestrator:
             time.sleep(self.check_interval)
 
     def should_retrain(self) -> bool:
-        if self.current_job and self.current_job.status not in [RetrainingStatus.COMPLETED, RetrainingStatus.FAILED]:
+        if not self._idle.is_set():
             return False
         stats = self.data_collector.get_stats_summary()
         if stats['total_samples'] < self.config.min_samples_for_retraining:
@@ -100,19 +113,43 @@ class RetrainingOrchestrator:
         return True
 
     def trigger_retraining(self, trigger: str='manual') -> str:
-        with self.job_lock:
-            job_id = f"job_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            self.current_job = RetrainingJob(job_id=job_id, status=RetrainingStatus.SCHEDULED, triggered_by=trigger, created_at=datetime.now())
-            logger.info(f'Retraining job {job_id} triggered by {trigger}')
-        threading.Thread(target=self._run_retraining_job, daemon=True).start()
+        with self._trigger_lock:
+            if not self._idle.is_set():
+                return self.current_job.job_id
+            self._idle.clear()
+            base_id = job_id = f"job_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            suffix = 1
+            while job_id in self._job_index:
+                job_id = f'{base_id}_{suffix}'
+                suffix += 1
+            job = RetrainingJob(job_id=job_id, status=RetrainingStatus.SCHEDULED, triggered_by=trigger, created_at=datetime.now())
+            self._job_index[job_id] = job
+            self.current_job = job
+        logger.info(f'Retraining job {job_id} triggered by {trigger}')
+        self._ensure_job_worker()
+        self._job_queue.put(job)
         return job_id
 
-    def _run_retraining_job(self):
-        job = self.current_job
+    def _ensure_job_worker(self):
+        with self.job_lock:
+            if self._job_worker is None or not self._job_worker.is_alive():
+                self._job_worker = threading.Thread(target=self._job_worker_loop, daemon=True)
+                self._job_worker.start()
+
+    def _job_worker_loop(self):
+        while True:
+            job = self._job_queue.get()
+            if job is None:
+                break
+            self._run_retraining_job(job)
+
+    def _run_retraining_job(self, job: Optional[RetrainingJob]=None):
+        job = job or self.current_job
         if not job:
             return
         try:
-            self._update_job_status(RetrainingStatus.PREPARING_DATA)
+            import numpy as np
+            self._update_job_status(RetrainingStatus.PREPARING_DATA, job)
             job.started_at = datetime.now()
             if self.on_job_started:
                 self.on_job_started(job)
@@ -121,23 +158,22 @@ class RetrainingOrchestrator:
             if len(train_data) == 0:
                 raise ValueError('No training data available')
             job.num_samples = len(train_data)
-            self._update_job_status(RetrainingStatus.TRAINING)
+            self._update_job_status(RetrainingStatus.TRAINING, job)
             logger.info(f'Training model with {len(train_data)} samples...')
             model, train_acc, val_acc = self._train_model(train_data, val_data)
             job.train_accuracy = train_acc
             job.val_accuracy = val_acc
-            self._update_job_status(RetrainingStatus.VALIDATING)
+            self._update_job_status(RetrainingStatus.VALIDATING, job)
             logger.info('Validating model...')
             if not self._validate_model(model, val_acc):
                 raise ValueError(f'Model validation failed: accuracy {val_acc:.4f} not better than production {self.production_accuracy:.4f}')
-            self._update_job_status(RetrainingStatus.DEPLOYING)
-            version = self._save_model(model)
+            self._update_job_status(RetrainingStatus.DEPLOYING, job)
+            version = self._save_model(model, job)
             job.model_version = version
             if self.deployment_manager:
                 self.deployment_manager.deploy_model(version)
-            sample_ids = [s['sample_id'] for s in train_data + val_data]
-            self.data_collector.mark_used_for_training(sample_ids)
-            self._update_job_status(RetrainingStatus.COMPLETED)
+            self.data_collector.mark_used_for_training(np.concatenate((train_data.sample_ids, val_data.sample_ids)))
+            self._update_job_status(RetrainingStatus.COMPLETED, job)
             job.completed_at = datetime.now()
             self.production_accuracy = val_acc
             logger.info(f'Retraining completed: version {version}, accuracy {val_acc:.4f}')
@@ -146,49 +182,62 @@ class RetrainingOrchestrator:
         except Exception as e:
             logger.error(f'Retraining failed: {e}')
             job.error_message = str(e)
-            self._update_job_status(RetrainingStatus.FAILED)
+            self._update_job_status(RetrainingStatus.FAILED, job)
             job.completed_at = datetime.now()
             if self.on_job_failed:
                 self.on_job_failed(job, e)
         finally:
             self.job_history.append(job)
+            with self._trigger_lock:
+                if self._job_queue.empty():
+                    self._idle.set()
 
-    def _update_job_status(self, status: RetrainingStatus):
-        if self.current_job:
-            self.current_job.status = status
+    def _update_job_status(self, status: RetrainingStatus, job: Optional[RetrainingJob]=None):
+        job = job or self.current_job
+        if job:
+            job.status = status
             logger.info(f'Job status: {status.value}')
 
     def _prepare_data(self):
         import numpy as np
-        samples = self.data_collector.get_training_dataset(min_confidence=0.5, labeled_only=True)
-        np.random.shuffle(samples)
-        split_idx = int(len(samples) * (1 - self.config.validation_split))
-        train_data = samples[:split_idx]
-        val_data = samples[split_idx:]
-        return (train_data, val_data)
+        dataset = self.data_collector.get_training_arrays(min_confidence=0.5, labeled_only=True)
+        indices = np.random.permutation(len(dataset))
+        split_idx = int(len(indices) * (1 - self.config.validation_split))
+        return (dataset.take(indices[:split_idx]), dataset.take(indices[split_idx:]))
 
     def _train_model(self, train_data, val_data):
-        import numpy as np
-        X_train = np.array([s['features'] for s in train_data], dtype=np.float32)
-        y_train = np.array([s['true_label'] for s in train_data], dtype=np.int32)
-        X_val = np.array([s['features'] for s in val_data], dtype=np.float32)
-        y_val = np.array([s['true_label'] for s in val_data], dtype=np.int32)
+        X_train, y_train = (train_data.features, train_data.labels)
+        X_val, y_val = (val_data.features, val_data.labels)
         model = self.model_factory(input_dim=X_train.shape[1])
         history = model.fit(X_train, y_train, X_val=X_val, y_val=y_val, epochs=self.config.epochs, batch_size=self.config.batch_size, early_stopping_patience=self.config.early_stopping_patience, verbose=1)
-        train_metrics = model.evaluate(X_train, y_train)
-        val_metrics = model.evaluate(X_val, y_val)
-        return (model, train_metrics['accuracy'], val_metrics['accuracy'])
+        train_acc = self._final_metric(history, 'accuracy')
+        if train_acc is None:
+            train_acc = model.evaluate(X_train, y_train)['accuracy']
+        val_acc = self._final_metric(history, 'val_accuracy')
+        if val_acc is None:
+            val_acc = model.evaluate(X_val, y_val)['accuracy']
+        return (model, train_acc, val_acc)
+
+    def _final_metric(self, history, key: str) -> Optional[float]:
+        metrics = getattr(history, 'history', history)
+        if not isinstance(metrics, dict) or not metrics.get(key):
+            return None
+        monitored = metrics.get('val_loss') or metrics.get('loss')
+        best_epoch = min(range(len(monitored)), key=monitored.__getitem__) if monitored else -1
+        values = metrics[key]
+        return float(values[best_epoch] if best_epoch < len(values) else values[-1])
 
     def _validate_model(self, model, val_accuracy: float) -> bool:
         if val_accuracy < self.production_accuracy + self.config.min_accuracy_improvement:
             return False
         return True
 
-    def _save_model(self, model) -> str:
+    def _save_model(self, model, job: Optional[RetrainingJob]=None) -> str:
+        job = job or self.current_job
         version = f"v{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         model_path = self.models_dir / f'model_{version}'
         model.save(str(model_path))
-        metadata = {'version': version, 'created_at': datetime.now().isoformat(), 'accuracy': self.current_job.val_accuracy if self.current_job else 0, 'num_samples': self.current_job.num_samples if self.current_job else 0}
+        metadata = {'version': version, 'created_at': datetime.now().isoformat(), 'accuracy': job.val_accuracy if job else 0, 'num_samples': job.num_samples if job else 0}
         metadata_path = self.models_dir / f'model_{version}_metadata.json'
         with open(metadata_path, 'w') as f:
             json.dump(metadata, f, indent=2)
@@ -196,10 +245,8 @@ class RetrainingOrchestrator:
 
     def get_job_status(self, job_id: str=None) -> Optional[Dict]:
         if job_id:
-            for job in [self.current_job] + self.job_history:
-                if job and job.job_id == job_id:
-                    return self._job_to_dict(job)
-            return None
+            job = self._job_index.get(job_id)
+            return self._job_to_dict(job) if job else None
         elif self.current_job:
             return self._job_to_dict(self.current_job)
         return None
@@ -0,0 +1,24 @@
+from cloud.services.deployment_manager import DeploymentManager, DeploymentStatus
+
+def make_manager(tmp_path):
+    manager = DeploymentManager(models_dir=str(tmp_path / 'models'), registry_file=str(tmp_path / 'models' / 'registry.json'))
+    model_path = tmp_path / 'model.tflite'
+    model_path.write_bytes(b'\x00' * 128)
+    manager.register_model(str(model_path), 'v1.0.0', accuracy=0.9)
+    manager.notified = []
+    manager.notify_device = lambda device_id, info: manager.notified.append(device_id)
+    return manager
+
+def test_duplicate_target_devices_are_counted_once(tmp_path):
+    manager = make_manager(tmp_path)
+    deployment_id = manager.deploy_model('v1.0.0', target_devices=['dev-1', 'dev-1', 'dev-2'])
+    deployment = manager.deployments[deployment_id]
+    assert deployment.target_devices == ['dev-1', 'dev-2']
+    assert deployment.pending_count == 2
+    assert sorted(manager.notified) == ['dev-1', 'dev-2']
+    manager.report_device_status('dev-1', 'completed', current_version='v1.0.0')
+    assert deployment.status == DeploymentStatus.ROLLING_OUT
+    assert deployment.pending_count == 1
+    manager.report_device_status('dev-2', 'completed', current_version='v1.0.0')
+    assert deployment.status == DeploymentStatus.COMPLETED
+    assert deployment.success_count == 2
\ No newline at end of file
@@ -0,0 +1,13 @@
+import numpy as np
+from cloud.services.labeling_service import label_name
+
+def test_label_name_accepts_numpy_integers():
+    labels = np.array([0, 3, 4], dtype=np.int64)
+    assert [label_name(label) for label in labels] == ['Normal', 'Bearing Fault', 'Looseness']
+    assert label_name(np.int32(1)) == 'Imbalance'
+
+def test_label_name_falls_back_for_unknown_labels():
+    assert label_name(5) == 'Unknown'
+    assert label_name(-1) == 'Unknown'
+    assert label_name(None) == 'Unknown'
+    assert label_name('2', default='?') == '?'
\ No newline at end of file
@@ -1,45 +1,220 @@
 import json
+import math
 import sys
+from functools import lru_cache
+from importlib.util import find_spec
 from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Any
 try:
     import pandas as pd
-    import matplotlib.pyplot as plt
     import numpy as np
-    from scipy import stats
 except ImportError:
     print('Error: Required packages not installed')
-    print('Install with: pip install pandas matplotlib numpy scipy')
+    print('Install with: pip install pandas numpy')
     sys.exit(1)
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+CSV_SCHEMA = {'timestamp': 'int64', 'temperature': 'float64', 'anomaly_score': 'float64', 'rms': 'float64', 'peakToPeak': 'float64', 'kurtosis': 'float64', 'skewness': 'float64', 'crestFactor': 'float64', 'variance': 'float64', 'spectralCentroid': 'float64', 'spectralSpread': 'float64', 'bandPowerRatio': 'float64', 'dominantFreq': 'float64'}
+MAX_PLOT_POINTS = 50000
+DEFAULT_DPI = 120
+PNG_OPTIONS = {'compress_level': 1}
+
+@lru_cache(maxsize=None)
+def load_pyplot():
+    try:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print('Error: Required packages not installed')
+        print('Install with: pip install matplotlib')
+        sys.exit(1)
+    plt.rcParams.update({'path.simplify': True, 'path.simplify_threshold': 1.0, 'agg.path.chunksize': 10000})
+    return plt
+
+def decimation_index(values, max_points: int=MAX_PLOT_POINTS):
+    n = len(values)
+    if n <= max_points:
+        return slice(None)
+    size = -(-n // (max_points // 2))
+    buckets = -(-n // size)
+    padded = np.pad(values, (0, buckets * size - n), mode='edge').reshape(buckets, size)
+    offsets = np.arange(buckets) * size
+    picks = np.concatenate((offsets + padded.argmin(axis=1), offsets + padded.argmax(axis=1)))
+    return np.unique(np.minimum(picks, n - 1))
+
+def _summary5(a):
+    values = np.empty(a.size, dtype=np.float64)
+    n = 0
+    mean = 0.0
+    m2 = 0.0
+    lo = np.inf
+    hi = -np.inf
+    for x in a:
+        if x != x:
+            continue
+        values[n] = x
+        n += 1
+        delta = x - mean
+        mean += delta / n
+        m2 += delta * (x - mean)
+        if x < lo:
+            lo = x
+        if x > hi:
+            hi = x
+    if n == 0:
+        return (np.nan, np.nan, np.nan, np.nan, np.nan)
+    std = math.sqrt(m2 / (n - 1)) if n > 1 else np.nan
+    pos = 0.95 * (n - 1)
+    k = int(math.floor(pos))
+    partitioned = np.partition(values[:n], k)
+    lower = partitioned[k]
+    upper = partitioned[k + 1:].min() if k + 1 < n else lower
+    return (mean, std, lo, hi, lower + (upper - lower) * (pos - k))
+
+def _corr_sym(X):
+    num_features, n_rows = X.shape
+    out = np.empty((num_features, num_features), dtype=np.float64)
+    for i in prange(num_features):
+        for j in range(i, num_features):
+            n = 0
+            mean_x = 0.0
+            mean_y = 0.0
+            var_x = 0.0
+            var_y = 0.0
+            cov = 0.0
+            for k in range(n_rows):
+                x = X[i, k]
+                y = X[j, k]
+                if x != x or y != y:
+                    continue
+                n += 1
+                dx = x - mean_x
+                mean_x += dx / n
+                dy = y - mean_y
+                mean_y += dy / n
+                cov += dx * (y - mean_y)
+                var_x += dx * (x - mean_x)
+                var_y += dy * (y - mean_y)
+            r = np.nan
+            if n > 1 and var_x > 0 and var_y > 0:
+                r = max(-1.0, min(1.0, cov / math.sqrt(var_x * var_y)))
+            out[i, j] = r
+            out[j, i] = r
+    return out
+
+def _histograms(X, bins):
+    num_features, n_rows = X.shape
+    counts = np.zeros((num_features, bins), dtype=np.int64)
+    edges = np.empty((num_features, bins + 1), dtype=np.float64)
+    for i in prange(num_features):
+        lo = np.inf
+        hi = -np.inf
+        for k in range(n_rows):
+            x = X[i, k]
+            if x == x:
+                lo = min(lo, x)
+                hi = max(hi, x)
+        if lo > hi:
+            lo = 0.0
+            hi = 1.0
+        elif lo == hi:
+            lo -= 0.5
+            hi += 0.5
+        for b in range(bins):
+            edges[i, b] = lo + b * (hi - lo) / bins
+        edges[i, bins] = hi
+        norm = bins / (hi - lo)
+        for k in range(n_rows):
+            x = X[i, k]
+            if x != x:
+                continue
+            b = min(int((x - lo) * norm), bins - 1)
+            if x < edges[i, b]:
+                b -= 1
+            elif b < bins - 1 and x >= edges[i, b + 1]:
+                b += 1
+            counts[i, b] += 1
+    return (counts, edges)
+try:
+    from numba import njit, prange
+    summary5 = njit('UniTuple(float64, 5)(float64[::1])', cache=True)(_summary5)
+    corr_sym = njit('float64[:, ::1](float64[:, ::1])', parallel=True, cache=True)(_corr_sym)
+    histograms = njit('Tuple((int64[:, ::1], float64[:, ::1]))(float64[:, ::1], int64)', parallel=True, cache=True)(_histograms)
+except ImportError:
+
+    def summary5(a):
+        a = a[~np.isnan(a)]
+        if a.size == 0:
+            return (np.nan, np.nan, np.nan, np.nan, np.nan)
+        return (a.mean(), a.std(ddof=1) if a.size > 1 else np.nan, a.min(), a.max(), np.percentile(a, 95))
+
+    def corr_sym(X):
+        return pd.DataFrame(X.T).corr().to_numpy()
+
+    def histograms(X, bins):
+        results = [np.histogram(row[~np.isnan(row)], bins=bins) for row in X]
+        return (np.array([counts for counts, _ in results]), np.array([edges for _, edges in results]))
 
 class VibrationAnalyzer:
 
-    def __init__(self, data_file: str=None):
+    def __init__(self, data_file: str=None, dpi: int=DEFAULT_DPI):
         self.data_file = data_file
+        self.dpi = dpi
         self.df = None
+        self._figs = {}
+        self._colorbar = None
 
     def load_json_logs(self, file_path: str):
-        data = []
-        with open(file_path, 'r') as f:
+        with open(file_path, 'rb') as f:
+            capacity = sum((1 for _ in f))
+        timestamps = np.empty(capacity, dtype=np.int64)
+        temperatures = np.empty(capacity, dtype=np.float64)
+        fault_types = np.empty(capacity, dtype=object)
+        fault_severities = np.empty(capacity, dtype=object)
+        anomaly_scores = np.empty(capacity, dtype=np.float64)
+        features = {}
+        n = 0
+        with open(file_path, 'rb') as f:
             for line in f:
+                if not line.strip():
+                    continue
                 try:
-                    entry = json.loads(line.strip())
-                    flat_entry = {'timestamp': entry['timestamp'], 'temperature': entry.get('temperature', 0), 'fault_type': entry['fault']['type'], 'fault_severity': entry['fault']['severity'], 'anomaly_score': entry['fault']['anomalyScore']}
-                    for key, value in entry['features'].items():
-                        flat_entry[key] = value
-                    data.append(flat_entry)
-                except (json.JSONDecodeError, KeyError) as e:
+                    entry = json_loads(line)
+                    fault = entry['fault']
+                    row = (int(entry['timestamp']), float(entry.get('temperature') or 0), fault['type'], fault['severity'], np.float64(fault['anomalyScore']))
+                    feature_values = [(key, np.float64(value)) for key, value in entry['features'].items()]
+                except (json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
                     print(f'Warning: Skipping malformed entry: {e}')
-        self.df = pd.DataFrame(data)
-        self.df['timestamp'] = pd.to_datetime(self.df['timestamp'], unit='ms')
+                    continue
+                timestamps[n], temperatures[n], fault_types[n], fault_severities[n], anomaly_scores[n] = row
+                for key, value in feature_values:
+                    column = features.get(key)
+                    if column is None:
+                        column = features[key] = np.full(capacity, np.nan)
+                    column[n] = value
+                n += 1
+        data = {'timestamp': pd.to_datetime(timestamps[:n], unit='ms'), 'temperature': temperatures[:n], 'fault_type': fault_types[:n], 'fault_severity': fault_severities[:n], 'anomaly_score': anomaly_scores[:n]}
+        for key, column in features.items():
+            data[key] = column[:n]
+        self.df = pd.DataFrame(data, copy=False)
         print(f'[OK] Loaded {len(self.df)} records')
 
     def load_csv_logs(self, file_path: str):
-        self.df = pd.read_csv(file_path)
-        self.df['timestamp'] = pd.to_datetime(self.df['timestamp'], unit='ms')
+        with open(file_path, 'r') as f:
+            header = f.readline().strip().split(',')
+        dtype = {column: CSV_SCHEMA[column] for column in header if column in CSV_SCHEMA}
+        engine = 'pyarrow' if find_spec('pyarrow') is not None else 'c'
+        self.df = pd.read_csv(file_path, engine=engine, dtype=dtype)
+        self.df['timestamp'] = pd.to_datetime(self.df['timestamp'].to_numpy(), unit='ms')
         print(f'[OK] Loaded {len(self.df)} records')
 
+    def _column_summary(self, column: str):
+        return summary5(np.ascontiguousarray(self.df[column].to_numpy(dtype=np.float64)))
+
     def generate_summary_stats(self):
         print('\n' + '=' * 60)
         print('SUMMARY STATISTICS')
@@ -63,25 +238,51 @@ class VibrationAnalyzer:
         stats_df = self.df[features].describe()
         print(stats_df.to_string())
         print(f'\nAnomaly Score Statistics:')
-        print(f"  Mean: {self.df['anomaly_score'].mean():.4f}")
-        print(f"  Std: {self.df['anomaly_score'].std():.4f}")
-        print(f"  Min: {self.df['anomaly_score'].min():.4f}")
-        print(f"  Max: {self.df['anomaly_score'].max():.4f}")
-        print(f"  95th percentile: {self.df['anomaly_score'].quantile(0.95):.4f}")
+        mean, std, lo, hi, p95 = self._column_summary('anomaly_score')
+        print(f'  Mean: {mean:.4f}')
+        print(f'  Std: {std:.4f}')
+        print(f'  Min: {lo:.4f}')
+        print(f'  Max: {hi:.4f}')
+        print(f'  95th percentile: {p95:.4f}')
+
+    def _figure(self, key: str, nrows: int=1, ncols: int=1, figsize=None):
+        cached = self._figs.get(key)
+        if cached is None:
+            cached = self._figs[key] = load_pyplot().subplots(nrows, ncols, figsize=figsize, layout='tight')
+        else:
+            for ax in np.atleast_1d(cached[1]).flat:
+                ax.clear()
+        return cached
+
+    def close(self):
+        for fig, _ in self._figs.values():
+            load_pyplot().close(fig)
+        self._figs.clear()
+        self._colorbar = None
+
+    def _feature_matrix(self, features: List[str]):
+        return np.ascontiguousarray(self.df[features].to_numpy(dtype=np.float64).T)
+
+    def _plot_series(self, ax, timestamps, column: str, **kwargs):
+        values = self.df[column].to_numpy()
+        index = decimation_index(values)
+        return ax.plot(timestamps[index], values[index], **kwargs)
 
     def plot_time_series(self, output_dir: str='plots'):
         Path(output_dir).mkdir(exist_ok=True)
         print(f'\nGenerating time series plots...')
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 8))
-        ax1.plot(self.df['timestamp'], self.df['rms'], label='RMS', color='blue', alpha=0.7)
+        fig, (ax1, ax2) = self._figure('time_series', 2, 1, figsize=(12, 8))
+        timestamps = self.df['timestamp'].to_numpy()
+        self._plot_series(ax1, timestamps, 'rms', label='RMS', color='blue', alpha=0.7)
         ax1.set_ylabel('RMS', fontsize=12)
         ax1.set_title('Vibration RMS Over Time', fontsize=14, fontweight='bold')
         ax1.grid(True, alpha=0.3)
         ax1.legend()
-        fault_mask = self.df['fault_type'] != 'NONE'
-        if fault_mask.any():
-            ax1.scatter(self.df.loc[fault_mask, 'timestamp'], self.df.loc[fault_mask, 'rms'], color='red', s=100, marker='x', label='Fault', zorder=5)
-        ax2.plot(self.df['timestamp'], self.df['anomaly_score'], label='Anomaly Score', color='orange', alpha=0.7)
+        fault_idx = np.flatnonzero(self.df['fault_type'].to_numpy() != 'NONE')
+        fault_timestamps = timestamps[fault_idx]
+        if fault_idx.size:
+            ax1.plot(fault_timestamps, self.df['rms'].to_numpy()[fault_idx], linestyle='none', color='red', markersize=10, marker='x', label='Fault', zorder=5)
+        self._plot_series(ax2, timestamps, 'anomaly_score', label='Anomaly Score', color='orange', alpha=0.7)
         ax2.axhline(y=2.0, color='yellow', linestyle='--', label='Warning Threshold')
         ax2.axhline(y=3.0, color='red', linestyle='--', label='Critical Threshold')
         ax2.set_xlabel('Time', fontsize=12)
@@ -89,104 +290,104 @@ class VibrationAnalyzer:
         ax2.set_title('Anomaly Score Over Time', fontsize=14, fontweight='bold')
         ax2.grid(True, alpha=0.3)
         ax2.legend()
-        plt.tight_layout()
-        plt.savefig(f'{output_dir}/time_series.png', dpi=300, bbox_inches='tight')
+        fig.savefig(f'{output_dir}/time_series.png', dpi=self.dpi, pil_kwargs=PNG_OPTIONS)
         print(f'  [OK] Saved: {output_dir}/time_series.png')
-        plt.close()
-        fig, axes = plt.subplots(2, 2, figsize=(14, 10))
+        fig, axes = self._figure('features_time_series', 2, 2, figsize=(14, 10))
         features_to_plot = [('rms', 'RMS', axes[0, 0]), ('kurtosis', 'Kurtosis', axes[0, 1]), ('crestFactor', 'Crest Factor', axes[1, 0]), ('dominantFreq', 'Dominant Frequency (Hz)', axes[1, 1])]
         for feature, title, ax in features_to_plot:
-            ax.plot(self.df['timestamp'], self.df[feature], alpha=0.7)
+            self._plot_series(ax, timestamps, feature, alpha=0.7)
             ax.set_ylabel(title, fontsize=11)
             ax.set_title(title, fontsize=12, fontweight='bold')
             ax.grid(True, alpha=0.3)
-            if fault_mask.any():
-                ax.scatter(self.df.loc[fault_mask, 'timestamp'], self.df.loc[fault_mask, feature], color='red', s=50, marker='x', zorder=5)
-        plt.tight_layout()
-        plt.savefig(f'{output_dir}/features_time_series.png', dpi=300, bbox_inches='tight')
+            if fault_idx.size:
+                ax.plot(fault_timestamps, self.df[feature].to_numpy()[fault_idx], linestyle='none', color='red', markersize=7, marker='x', zorder=5)
+        fig.savefig(f'{output_dir}/features_time_series.png', dpi=self.dpi, pil_kwargs=PNG_OPTIONS)
         print(f'  [OK] Saved: {output_dir}/features_time_series.png')
-        plt.close()
 
     def plot_distributions(self, output_dir: str='plots'):
         Path(output_dir).mkdir(exist_ok=True)
         print(f'\nGenerating distribution plots...')
         features = ['rms', 'kurtosis', 'skewness', 'crestFactor', 'variance', 'spectralCentroid', 'dominantFreq']
-        fig, axes = plt.subplots(3, 3, figsize=(15, 12))
+        fig, axes = self._figure('distributions', 3, 3, figsize=(15, 12))
         axes = axes.flatten()
-        for idx, feature in enumerate(features):
-            if feature in self.df.columns:
-                ax = axes[idx]
-                ax.hist(self.df[feature], bins=50, alpha=0.7, color='skyblue', edgecolor='black')
-                ax.set_xlabel(feature, fontsize=10)
-                ax.set_ylabel('Frequency', fontsize=10)
-                ax.set_title(f'Distribution: {feature}', fontsize=11, fontweight='bold')
-                ax.grid(True, alpha=0.3)
-                mean_val = self.df[feature].mean()
-                std_val = self.df[feature].std()
-                ax.axvline(mean_val, color='red', linestyle='--', label=f'Mean: {mean_val:.2f}', linewidth=2)
-                ax.axvline(mean_val + std_val, color='orange', linestyle=':', label=f'±1σ', linewidth=1.5)
-                ax.axvline(mean_val - std_val, color='orange', linestyle=':', linewidth=1.5)
-                ax.legend(fontsize=8)
+        present = [feature for feature in features if feature in self.df.columns]
+        counts, edges = histograms(self._feature_matrix(present), 50)
+        for row, feature in enumerate(present):
+            ax = axes[features.index(feature)]
+            ax.bar(edges[row, :-1], counts[row], width=np.diff(edges[row]), align='edge', alpha=0.7, color='skyblue', edgecolor='black')
+            ax.set_xlabel(feature, fontsize=10)
+            ax.set_ylabel('Frequency', fontsize=10)
+            ax.set_title(f'Distribution: {feature}', fontsize=11, fontweight='bold')
+            ax.grid(True, alpha=0.3)
+            mean_val = self.df[feature].mean()
+            std_val = self.df[feature].std()
+            ax.axvline(mean_val, color='red', linestyle='--', label=f'Mean: {mean_val:.2f}', linewidth=2)
+            ax.axvline(mean_val + std_val, color='orange', linestyle=':', label=f'±1σ', linewidth=1.5)
+            ax.axvline(mean_val - std_val, color='orange', linestyle=':', linewidth=1.5)
+            ax.legend(fontsize=8)
         for idx in range(len(features), len(axes)):
             axes[idx].set_visible(False)
-        plt.tight_layout()
-        plt.savefig(f'{output_dir}/distributions.png', dpi=300, bbox_inches='tight')
+        fig.savefig(f'{output_dir}/distributions.png', dpi=self.dpi, pil_kwargs=PNG_OPTIONS)
         print(f'  [OK] Saved: {output_dir}/distributions.png')
-        plt.close()
 
     def plot_correlation_matrix(self, output_dir: str='plots'):
         Path(output_dir).mkdir(exist_ok=True)
         print(f'\nGenerating correlation matrix...')
         features = ['rms', 'peakToPeak', 'kurtosis', 'skewness', 'crestFactor', 'variance', 'spectralCentroid', 'spectralSpread', 'dominantFreq', 'anomaly_score']
-        corr_matrix = self.df[features].corr()
-        fig, ax = plt.subplots(figsize=(12, 10))
+        corr_matrix = corr_sym(self._feature_matrix(features))
+        fig, ax = self._figure('correlation_matrix', figsize=(12, 10))
         im = ax.imshow(corr_matrix, cmap='coolwarm', aspect='auto', vmin=-1, vmax=1)
         ax.set_xticks(range(len(features)))
         ax.set_yticks(range(len(features)))
         ax.set_xticklabels(features, rotation=45, ha='right')
         ax.set_yticklabels(features)
-        cbar = plt.colorbar(im, ax=ax)
-        cbar.set_label('Correlation', fontsize=12)
+        if self._colorbar is None:
+            self._colorbar = fig.colorbar(im, ax=ax)
+            self._colorbar.set_label('Correlation', fontsize=12)
+        else:
+            self._colorbar.update_normal(im)
         for i in range(len(features)):
             for j in range(len(features)):
-                text = ax.text(j, i, f'{corr_matrix.iloc[i, j]:.2f}', ha='center', va='center', color='black', fontsize=8)
+                text = ax.text(j, i, f'{corr_matrix[i, j]:.2f}', ha='center', va='center', color='black', fontsize=8)
         ax.set_title('Feature Correlation Matrix', fontsize=14, fontweight='bold', pad=20)
-        plt.tight_layout()
-        plt.savefig(f'{output_dir}/correlation_matrix.png', dpi=300, bbox_inches='tight')
+        fig.savefig(f'{output_dir}/correlation_matrix.png', dpi=self.dpi, pil_kwargs=PNG_OPTIONS)
         print(f'  [OK] Saved: {output_dir}/correlation_matrix.png')
-        plt.close()
 
     def generate_report(self, output_file: str='analysis_report.txt'):
         print(f'\nGenerating analysis report...')
+        lines = []
+        lines.append('=' * 70 + '\n')
+        lines.append('MOTOR VIBRATION ANALYSIS REPORT\n')
+        lines.append('=' * 70 + '\n\n')
+        lines.append(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        lines.append(f'Data File: {self.data_file}\n')
+        lines.append(f'Total Records: {len(self.df)}\n\n')
+        lines.append('TIME RANGE\n')
+        lines.append('-' * 70 + '\n')
+        start, end = (self.df['timestamp'].min(), self.df['timestamp'].max())
+        lines.append(f'Start: {start}\n')
+        lines.append(f'End:   {end}\n')
+        lines.append(f'Duration: {end - start}\n\n')
+        lines.append('FAULT ANALYSIS\n')
+        lines.append('-' * 70 + '\n')
+        fault_counts = self.df['fault_type'].value_counts()
+        for fault_type, count in fault_counts.items():
+            pct = count / len(self.df) * 100
+            lines.append(f'{fault_type:20s}: {count:6d} ({pct:5.1f}%)\n')
+        lines.append('\n')
+        lines.append('FEATURE STATISTICS\n')
+        lines.append('-' * 70 + '\n')
+        features = ['rms', 'kurtosis', 'crestFactor', 'dominantFreq']
+        for feature in features:
+            mean, std, lo, hi, _ = self._column_summary(feature)
+            lines.append(f'\n{feature}:\n')
+            lines.append(f'  Mean: {mean:.4f}\n')
+            lines.append(f'  Std:  {std:.4f}\n')
+            lines.append(f'  Min:  {lo:.4f}\n')
+            lines.append(f'  Max:  {hi:.4f}\n')
+        lines.append('\n' + '=' * 70 + '\n')
         with open(output_file, 'w') as f:
-            f.write('=' * 70 + '\n')
-            f.write('MOTOR VIBRATION ANALYSIS REPORT\n')
-            f.write('=' * 70 + '\n\n')
-            f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f'Data File: {self.data_file}\n')
-            f.write(f'Total Records: {len(self.df)}\n\n')
-            f.write('TIME RANGE\n')
-            f.write('-' * 70 + '\n')
-            f.write(f"Start: {self.df['timestamp'].min()}\n")
-            f.write(f"End:   {self.df['timestamp'].max()}\n")
-            f.write(f"Duration: {self.df['timestamp'].max() - self.df['timestamp'].min()}\n\n")
-            f.write('FAULT ANALYSIS\n')
-            f.write('-' * 70 + '\n')
-            fault_counts = self.df['fault_type'].value_counts()
-            for fault_type, count in fault_counts.items():
-                pct = count / len(self.df) * 100
-                f.write(f'{fault_type:20s}: {count:6d} ({pct:5.1f}%)\n')
-            f.write('\n')
-            f.write('FEATURE STATISTICS\n')
-            f.write('-' * 70 + '\n')
-            features = ['rms', 'kurtosis', 'crestFactor', 'dominantFreq']
-            for feature in features:
-                f.write(f'\n{feature}:\n')
-                f.write(f'  Mean: {self.df[feature].mean():.4f}\n')
-                f.write(f'  Std:  {self.df[feature].std():.4f}\n')
-                f.write(f'  Min:  {self.df[feature].min():.4f}\n')
-                f.write(f'  Max:  {self.df[feature].max():.4f}\n')
-            f.write('\n' + '=' * 70 + '\n')
+            f.write(''.join(lines))
         print(f'  [OK] Saved: {output_file}')
 
 def main():
@@ -195,8 +396,9 @@ def main():
     parser.add_argument('input_file', help='Input data file (JSON or CSV)')
     parser.add_argument('--output-dir', default='plots', help='Output directory for plots')
     parser.add_argument('--format', choices=['json', 'csv'], default='json', help='Input file format')
+    parser.add_argument('--dpi', type=int, default=DEFAULT_DPI, help=f'Resolution of saved plots (default: {DEFAULT_DPI}, use 300 for print)')
     args = parser.parse_args()
-    analyzer = VibrationAnalyzer(args.input_file)
+    analyzer = VibrationAnalyzer(args.input_file, dpi=args.dpi)
     if args.format == 'json':
         analyzer.load_json_logs(args.input_file)
     else:
@@ -206,6 +408,7 @@ def main():
     analyzer.plot_distributions(args.output_dir)
     analyzer.plot_correlation_matrix(args.output_dir)
     analyzer.generate_report()
+    analyzer.close()
     print('\n[OK] Analysis complete!')
 if __name__ == '__main__':
     main()
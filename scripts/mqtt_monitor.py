@@ -1,5 +1,6 @@
 import json
 import sys
+import time
 from datetime import datetime
 from typing import Dict, Any
 try:
@@ -14,6 +15,11 @@ except ImportError:
     print('Error: Required packages not installed')
     print('Install with: pip install paho-mqtt rich')
     sys.exit(1)
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+REFRESH_PER_SECOND = 2
 
 class MotorMonitor:
 
@@ -27,9 +33,11 @@ class MotorMonitor:
         self.message_count = 0
         self.fault_count = 0
         self.start_time = datetime.now()
+        self._dirty = True
         self.client = mqtt.Client(client_id='MotorMonitor_Python')
         self.client.on_connect = self.on_connect
         self.client.on_message = self.on_message
+        self._handlers = {'motor/status': self._handle_status, 'motor/vibration': self._handle_vibration, 'motor/fault': self._handle_fault, 'motor/features': self._handle_vibration}
 
     def on_connect(self, client, userdata, flags, rc):
         if rc == 0:
@@ -42,20 +50,26 @@ class MotorMonitor:
     def on_message(self, client, userdata, msg):
         self.message_count += 1
         try:
-            payload = json.loads(msg.payload.decode())
-            if msg.topic == 'motor/status':
-                self.latest_status = payload.get('status', 'Unknown')
-            elif msg.topic == 'motor/vibration':
-                self.latest_vibration = payload
-            elif msg.topic == 'motor/fault':
-                self.latest_fault = payload
-                if payload.get('type') != 'NONE':
-                    self.fault_count += 1
-                    self.log_fault(payload)
-            elif msg.topic == 'motor/features':
-                self.latest_vibration = payload
+            payload = json_loads(msg.payload)
         except json.JSONDecodeError:
             self.console.print(f'[yellow]⚠ Invalid JSON from {msg.topic}[/yellow]')
+            return
+        handler = self._handlers.get(msg.topic)
+        if handler:
+            handler(payload)
+            self._dirty = True
+
+    def _handle_status(self, payload: Dict[str, Any]):
+        self.latest_status = payload.get('status', 'Unknown')
+
+    def _handle_vibration(self, payload: Dict[str, Any]):
+        self.latest_vibration = payload
+
+    def _handle_fault(self, payload: Dict[str, Any]):
+        self.latest_fault = payload
+        if payload.get('type') != 'NONE':
+            self.fault_count += 1
+            self.log_fault(payload)
 
     def log_fault(self, fault: Dict[str, Any]):
         severity = fault.get('severity', 'UNKNOWN')
@@ -70,12 +84,14 @@ class MotorMonitor:
         self.console.print(f"Description: {fault.get('description', 'N/A')}")
         self.console.print(f"[{color}]{'=' * 60}[/{color}]\n")
 
+    def _header_panel(self) -> Panel:
+        uptime = datetime.now() - self.start_time
+        return Panel(f'Motor Vibration Monitor | Uptime: {uptime} | Messages: {self.message_count}', style='bold white on blue')
+
     def generate_dashboard(self) -> Layout:
         layout = Layout()
         layout.split_column(Layout(name='header', size=3), Layout(name='body'), Layout(name='footer', size=5))
-        uptime = datetime.now() - self.start_time
-        header_text = f'Motor Vibration Monitor | Uptime: {uptime} | Messages: {self.message_count}'
-        layout['header'].update(Panel(header_text, style='bold white on blue'))
+        layout['header'].update(self._header_panel())
         layout['body'].split_row(Layout(name='left'), Layout(name='right'))
         if self.latest_vibration:
             features_table = Table(title='Vibration Features', box=box.ROUNDED)
@@ -125,9 +141,17 @@ class MotorMonitor:
             return
         self.client.loop_start()
         try:
-            with Live(self.generate_dashboard(), refresh_per_second=2, console=self.console) as live:
+            self._dirty = False
+            layout = self.generate_dashboard()
+            with Live(layout, refresh_per_second=REFRESH_PER_SECOND, console=self.console) as live:
                 while True:
-                    live.update(self.generate_dashboard())
+                    time.sleep(1 / REFRESH_PER_SECOND)
+                    if self._dirty:
+                        self._dirty = False
+                        layout = self.generate_dashboard()
+                        live.update(layout)
+                    else:
+                        layout['header'].update(self._header_panel())
         except KeyboardInterrupt:
             self.console.print('\n[yellow]Shutting down...[/yellow]')
         finally:
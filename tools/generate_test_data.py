@@ -1,113 +1,194 @@
 import numpy as np
-import csv
 import argparse
+import math
 import os
+from functools import lru_cache
 SAMPLE_RATE = 1000
 WINDOW_SIZE = 256
+_rng = np.random.default_rng()
 
-def generate_normal_signal(duration_ms, amplitude=0.2):
+@lru_cache(maxsize=8)
+def _timebase(num_samples):
+    t = np.arange(num_samples, dtype=np.float64) / SAMPLE_RATE
+    t.flags.writeable = False
+    return t
+
+@lru_cache(maxsize=8)
+def _rfftfreq(num_samples):
+    freqs = np.fft.rfftfreq(num_samples, 1 / SAMPLE_RATE)
+    freqs.flags.writeable = False
+    return freqs
+try:
+    from scipy.fft import rfft as _scipy_rfft
+
+    def rfft_rows(x, n):
+        return _scipy_rfft(x, n=n, axis=1, workers=-1)
+except ImportError:
+
+    def rfft_rows(x, n):
+        return np.fft.rfft(x, n=n, axis=1)
+
+def generate_normal_batch(batch, duration_ms, amplitude=0.2, dtype=np.float32):
     num_samples = int(duration_ms * SAMPLE_RATE / 1000)
-    t = np.linspace(0, duration_ms / 1000, num_samples)
-    signal = amplitude * np.random.randn(num_samples)
-    return signal
+    return amplitude * _rng.standard_normal((batch, num_samples), dtype=dtype)
 
-def generate_imbalance_signal(duration_ms, rpm=1800, amplitude=0.8):
+def generate_imbalance_batch(batch, duration_ms, rpm=1800, amplitude=0.8, dtype=np.float32):
     num_samples = int(duration_ms * SAMPLE_RATE / 1000)
-    t = np.linspace(0, duration_ms / 1000, num_samples)
-    freq = rpm / 60
-    signal = amplitude * np.sin(2 * np.pi * freq * t)
-    signal += 0.1 * np.random.randn(num_samples)
-    return signal
+    phase = 2 * np.pi * (rpm / 60) * _timebase(num_samples)
+    signals = 0.1 * _rng.standard_normal((batch, num_samples), dtype=dtype)
+    signals += amplitude * np.sin(phase)
+    return signals
 
-def generate_misalignment_signal(duration_ms, rpm=1800, amplitude=0.6):
+def generate_misalignment_batch(batch, duration_ms, rpm=1800, amplitude=0.6, dtype=np.float32):
     num_samples = int(duration_ms * SAMPLE_RATE / 1000)
-    t = np.linspace(0, duration_ms / 1000, num_samples)
-    freq = rpm / 60
-    signal = amplitude * np.sin(2 * np.pi * freq * t)
-    signal += 0.5 * amplitude * np.sin(2 * np.pi * 2 * freq * t)
-    signal += 0.3 * amplitude * np.sin(2 * np.pi * 3 * freq * t)
-    signal += 0.1 * np.random.randn(num_samples)
-    return signal
+    phase = 2 * np.pi * (rpm / 60) * _timebase(num_samples)
+    template = amplitude * np.sin(phase)
+    template += 0.5 * amplitude * np.sin(2 * phase)
+    template += 0.3 * amplitude * np.sin(3 * phase)
+    signals = 0.1 * _rng.standard_normal((batch, num_samples), dtype=dtype)
+    signals += template
+    return signals
 
-def generate_bearing_fault_signal(duration_ms, bpfo=120, amplitude=1.0):
+def generate_bearing_fault_batch(batch, duration_ms, bpfo=120, amplitude=1.0, dtype=np.float32):
     num_samples = int(duration_ms * SAMPLE_RATE / 1000)
-    t = np.linspace(0, duration_ms / 1000, num_samples)
     carrier_freq = 2000
-    signal = np.zeros(num_samples)
-    impulse_period = int(SAMPLE_RATE / bpfo)
-    for i in range(0, num_samples, impulse_period):
-        decay = np.exp(-np.arange(50) / 10)
-        burst = amplitude * decay * np.sin(2 * np.pi * carrier_freq * np.arange(50) / SAMPLE_RATE)
-        end_idx = min(i + len(burst), num_samples)
-        signal[i:end_idx] += burst[:end_idx - i]
-    signal += 0.15 * np.random.randn(num_samples)
-    return signal
+    burst_idx = np.arange(50)
+    burst = amplitude * np.exp(-burst_idx / 10) * np.sin(2 * np.pi * carrier_freq * burst_idx / SAMPLE_RATE)
+    template = np.zeros(num_samples)
+    cols = np.arange(0, num_samples, int(SAMPLE_RATE / bpfo))[:, None] + burst_idx
+    valid = cols < num_samples
+    np.add.at(template, cols[valid], np.broadcast_to(burst, cols.shape)[valid])
+    signals = 0.15 * _rng.standard_normal((batch, num_samples), dtype=dtype)
+    signals += template
+    return signals
 
-def generate_looseness_signal(duration_ms, rpm=1800, amplitude=0.7):
+def generate_looseness_batch(batch, duration_ms, rpm=1800, amplitude=0.7, dtype=np.float32):
     num_samples = int(duration_ms * SAMPLE_RATE / 1000)
-    t = np.linspace(0, duration_ms / 1000, num_samples)
-    freq = rpm / 60
-    signal = np.zeros(num_samples)
+    phase = 2 * np.pi * (rpm / 60) * _timebase(num_samples)
+    offsets = _rng.random((batch, 9)) * 2 * np.pi
+    signals = 0.2 * _rng.standard_normal((batch, num_samples), dtype=dtype)
     for harmonic in range(1, 10):
-        signal += amplitude / harmonic * np.sin(2 * np.pi * harmonic * freq * t + np.random.rand() * 2 * np.pi)
-    signal += 0.2 * np.random.randn(num_samples)
-    return signal
+        signals += amplitude / harmonic * np.sin(harmonic * phase + offsets[:, harmonic - 1:harmonic])
+    return signals
 
-def compute_features(signal):
+def generate_normal_signal(duration_ms, amplitude=0.2):
+    return generate_normal_batch(1, duration_ms, amplitude)[0]
+
+def generate_imbalance_signal(duration_ms, rpm=1800, amplitude=0.8):
+    return generate_imbalance_batch(1, duration_ms, rpm, amplitude)[0]
+
+def generate_misalignment_signal(duration_ms, rpm=1800, amplitude=0.6):
+    return generate_misalignment_batch(1, duration_ms, rpm, amplitude)[0]
+
+def generate_bearing_fault_signal(duration_ms, bpfo=120, amplitude=1.0):
+    return generate_bearing_fault_batch(1, duration_ms, bpfo, amplitude)[0]
+
+def generate_looseness_signal(duration_ms, rpm=1800, amplitude=0.7):
+    return generate_looseness_batch(1, duration_ms, rpm, amplitude)[0]
+
+def _signal_moments(x):
+    num_rows, n = x.shape
+    out = np.empty((num_rows, 6), dtype=np.float64)
+    for i in prange(num_rows):
+        shift = float(x[i, 0])
+        s1 = 0.0
+        s2 = 0.0
+        s3 = 0.0
+        s4 = 0.0
+        sq = 0.0
+        lo = shift
+        hi = shift
+        for j in range(n):
+            v = float(x[i, j])
+            d = v - shift
+            d2 = d * d
+            s1 += d
+            s2 += d2
+            s3 += d2 * d
+            s4 += d2 * d2
+            sq += v * v
+            if v < lo:
+                lo = v
+            if v > hi:
+                hi = v
+        mean = s1 / n
+        m2 = max(s2 / n - mean * mean, 0.0)
+        std = math.sqrt(m2)
+        out[i, 0] = math.sqrt(sq / n)
+        out[i, 1] = m2
+        if std > 0.0001:
+            m3 = s3 / n - 3 * mean * s2 / n + 2 * mean ** 3
+            m4 = s4 / n - 4 * mean * s3 / n + 6 * mean * mean * s2 / n - 3 * mean ** 4
+            out[i, 2] = m3 / std ** 3
+            out[i, 3] = m4 / (m2 * m2) - 3
+        else:
+            out[i, 2] = 0.0
+            out[i, 3] = 0.0
+        out[i, 4] = lo
+        out[i, 5] = hi
+    return out
+try:
+    from numba import njit, prange
+    signal_moments = njit(['float64[:, ::1](float32[:, ::1])', 'float64[:, ::1](float64[:, ::1])'], parallel=True, fastmath=True, cache=True)(_signal_moments)
+except ImportError:
+
+    def signal_moments(x):
+        mean = np.mean(x, axis=1, keepdims=True)
+        std = np.std(x, axis=1, keepdims=True)
+        valid_std = std[:, 0] > 0.0001
+        normalized = (x - mean) / np.where(std > 0.0001, std, 1.0)
+        skewness = np.where(valid_std, np.mean(normalized ** 3, axis=1), 0.0)
+        kurtosis = np.where(valid_std, np.mean(normalized ** 4, axis=1) - 3, 0.0)
+        return np.column_stack([np.sqrt(np.mean(x ** 2, axis=1)), std[:, 0] ** 2, skewness, kurtosis, np.min(x, axis=1), np.max(x, axis=1)])
+
+def compute_features_batch(signals):
+    signals = np.atleast_2d(signals)
+    signals = np.ascontiguousarray(signals, dtype=signals.dtype if signals.dtype == np.float32 else np.float64)
     features = {}
-    features['rms'] = np.sqrt(np.mean(signal ** 2))
-    features['peak_to_peak'] = np.max(signal) - np.min(signal)
-    mean = np.mean(signal)
-    std = np.std(signal)
-    features['variance'] = std ** 2
-    if std > 0.0001:
-        normalized = (signal - mean) / std
-        features['skewness'] = np.mean(normalized ** 3)
-        features['kurtosis'] = np.mean(normalized ** 4) - 3
-    else:
-        features['skewness'] = 0
-        features['kurtosis'] = 0
-    peak = max(abs(np.max(signal)), abs(np.min(signal)))
-    features['crest_factor'] = peak / features['rms'] if features['rms'] > 0.0001 else 0
-    spectrum = np.abs(np.fft.rfft(signal))
-    freqs = np.fft.rfftfreq(len(signal), 1 / SAMPLE_RATE)
-    total_power = np.sum(spectrum ** 2)
-    if total_power > 0.0001:
-        features['spectral_centroid'] = np.sum(freqs * spectrum ** 2) / total_power
-        features['spectral_spread'] = np.sqrt(np.sum((freqs - features['spectral_centroid']) ** 2 * spectrum ** 2) / total_power)
-    else:
-        features['spectral_centroid'] = 0
-        features['spectral_spread'] = 0
-    mid_idx = len(spectrum) // 2
-    low_band = np.sum(spectrum[:mid_idx] ** 2)
-    high_band = np.sum(spectrum[mid_idx:] ** 2)
-    features['band_power_ratio'] = high_band / low_band if low_band > 0.0001 else 0
-    features['dominant_frequency'] = freqs[np.argmax(spectrum[1:]) + 1]
+    rms, variance, skewness, kurtosis, peak_min, peak_max = signal_moments(signals).T
+    features['rms'] = rms
+    features['peak_to_peak'] = peak_max - peak_min
+    features['variance'] = variance
+    features['skewness'] = skewness
+    features['kurtosis'] = kurtosis
+    peak = np.maximum(np.abs(peak_max), np.abs(peak_min))
+    features['crest_factor'] = np.where(rms > 0.0001, peak / np.where(rms > 0.0001, rms, 1.0), 0.0)
+    n = signals.shape[1]
+    spectrum = np.abs(rfft_rows(signals, n))
+    freqs = _rfftfreq(n)
+    power = spectrum ** 2
+    total_power = np.sum(power, axis=1)
+    valid_power = total_power > 0.0001
+    safe_total = np.where(valid_power, total_power, 1.0)
+    centroid = np.where(valid_power, power @ freqs / safe_total, 0.0)
+    spread = np.sqrt(np.sum((freqs - centroid[:, None]) ** 2 * power, axis=1) / safe_total)
+    features['spectral_centroid'] = centroid
+    features['spectral_spread'] = np.where(valid_power, spread, 0.0)
+    mid_idx = spectrum.shape[1] // 2
+    low_band = np.sum(power[:, :mid_idx], axis=1)
+    high_band = np.sum(power[:, mid_idx:], axis=1)
+    features['band_power_ratio'] = np.where(low_band > 0.0001, high_band / np.where(low_band > 0.0001, low_band, 1.0), 0.0)
+    features['dominant_frequency'] = freqs[np.argmax(spectrum[:, 1:], axis=1) + 1]
     return features
 
+def compute_features(signal):
+    return {name: values[0] for name, values in compute_features_batch(signal).items()}
+
 def main():
     parser = argparse.ArgumentParser(description='Generate test vibration data')
     parser.add_argument('--output', type=str, default='test_data.csv', help='Output CSV file')
     parser.add_argument('--samples-per-class', type=int, default=100, help='Samples per fault class')
     parser.add_argument('--duration', type=int, default=256, help='Signal duration in ms')
     args = parser.parse_args()
-    generators = [('Normal', generate_normal_signal), ('Imbalance', generate_imbalance_signal), ('Misalignment', generate_misalignment_signal), ('BearingFault', generate_bearing_fault_signal), ('Looseness', generate_looseness_signal)]
-    rows = []
+    generators = [('Normal', generate_normal_batch), ('Imbalance', generate_imbalance_batch), ('Misalignment', generate_misalignment_batch), ('BearingFault', generate_bearing_fault_batch), ('Looseness', generate_looseness_batch)]
     feature_names = ['rms', 'peak_to_peak', 'kurtosis', 'skewness', 'crest_factor', 'variance', 'spectral_centroid', 'spectral_spread', 'band_power_ratio', 'dominant_frequency']
-    for class_idx, (class_name, generator) in enumerate(generators):
-        print(f'Generating {args.samples_per_class} samples for class: {class_name}')
-        for i in range(args.samples_per_class):
-            signal = generator(args.duration)
-            features = compute_features(signal)
-            row = [class_idx, class_name]
-            for name in feature_names:
-                row.append(features[name])
-            rows.append(row)
+    value_fmt = ','.join(['%.10g'] * len(feature_names))
     with open(args.output, 'w', newline='') as f:
-        writer = csv.writer(f)
-        header = ['class_id', 'class_name'] + feature_names
-        writer.writerow(header)
-        writer.writerows(rows)
-    print(f'\nGenerated {len(rows)} samples to {args.output}')
+        f.write(','.join(['class_id', 'class_name'] + feature_names) + '\n')
+        for class_idx, (class_name, generator) in enumerate(generators):
+            print(f'Generating {args.samples_per_class} samples for class: {class_name}')
+            features = compute_features_batch(generator(args.samples_per_class, args.duration))
+            np.savetxt(f, np.column_stack([features[name] for name in feature_names]), fmt=f'{class_idx},{class_name},{value_fmt}')
+    print(f'\nGenerated {args.samples_per_class * len(generators)} samples to {args.output}')
 if __name__ == '__main__':
     main()
\ No newline at end of file
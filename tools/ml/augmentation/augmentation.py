@@ -1,150 +1,217 @@
 import numpy as np
-from scipy import signal, interpolate
+from scipy import fft, signal, interpolate
 from typing import Optional, Tuple, List, Callable, Union
 import warnings
+from functools import lru_cache
 
-def add_gaussian_noise(data: np.ndarray, snr_db: float=20.0, random_state: Optional[int]=None) -> np.ndarray:
-    rng = np.random.default_rng(random_state)
-    signal_power = np.mean(data ** 2)
-    noise_power = signal_power / 10 ** (snr_db / 10)
-    noise = rng.normal(0, np.sqrt(noise_power), data.shape)
-    return data + noise
+@lru_cache(maxsize=16)
+def _arange(n: int) -> np.ndarray:
+    a = np.arange(n, dtype=np.float64)
+    a.flags.writeable = False
+    return a
 
-def add_colored_noise(data: np.ndarray, snr_db: float=20.0, color: str='pink', random_state: Optional[int]=None) -> np.ndarray:
-    rng = np.random.default_rng(random_state)
-    n = len(data)
-    white_noise = rng.normal(0, 1, n)
-    fft_noise = np.fft.rfft(white_noise)
-    freqs = np.fft.rfftfreq(n)
+@lru_cache(maxsize=16)
+def _cubic_basis(n: int) -> np.ndarray:
+    knots = np.linspace(0, n - 1, 4)
+    t = _arange(n)
+    basis = np.ones((n, 4))
+    for k in range(4):
+        for j in range(4):
+            if j != k:
+                basis[:, k] *= (t - knots[j]) / (knots[k] - knots[j])
+    basis.flags.writeable = False
+    return basis
+
+@lru_cache(maxsize=16)
+def _noise_shape(n: int, color: str) -> Optional[np.ndarray]:
+    freqs = fft.rfftfreq(n)
     freqs[0] = 1e-10
     if color == 'pink':
-        fft_noise = fft_noise / np.sqrt(freqs)
+        shape = 1 / np.sqrt(freqs)
     elif color == 'brown':
-        fft_noise = fft_noise / freqs
+        shape = 1 / freqs
     elif color == 'blue':
-        fft_noise = fft_noise * np.sqrt(freqs)
-    colored_noise = np.fft.irfft(fft_noise, n)
+        shape = np.sqrt(freqs)
+    else:
+        return None
+    shape.flags.writeable = False
+    return shape
+
+@lru_cache(maxsize=64)
+def _resonance_filter(resonance_freq: float, q_factor: float, sample_rate: float) -> Optional[np.ndarray]:
+    nyquist = sample_rate / 2
+    if resonance_freq >= nyquist:
+        return None
+    bandwidth = resonance_freq / q_factor
+    low = max((resonance_freq - bandwidth / 2) / nyquist, 0.01)
+    high = min((resonance_freq + bandwidth / 2) / nyquist, 0.99)
+    if low >= high:
+        return None
+    return signal.butter(2, [low, high], btype='band', output='sos')
+
+def _work_dtype(dtype: np.dtype) -> np.dtype:
+    return np.dtype(np.float32) if dtype == np.float32 else np.dtype(np.float64)
+
+def _noise_buffer(data: np.ndarray, out: Optional[np.ndarray]) -> np.ndarray:
+    if out is None:
+        return np.empty(data.shape, dtype=_work_dtype(data.dtype))
+    return out
+
+def add_gaussian_noise(data: np.ndarray, snr_db: float=20.0, random_state: Optional[Union[int, np.random.Generator]]=None, out: Optional[np.ndarray]=None) -> np.ndarray:
+    rng = np.random.default_rng(random_state)
     signal_power = np.mean(data ** 2)
-    noise_power = np.mean(colored_noise ** 2)
+    noise_power = signal_power / 10 ** (snr_db / 10)
+    out = _noise_buffer(data, out)
+    rng.standard_normal(out=out, dtype=out.dtype)
+    out *= np.sqrt(noise_power)
+    out += data
+    return out
+
+def add_colored_noise(data: np.ndarray, snr_db: float=20.0, color: str='pink', random_state: Optional[Union[int, np.random.Generator]]=None, out: Optional[np.ndarray]=None) -> np.ndarray:
+    rng = np.random.default_rng(random_state)
+    n = data.shape[-1]
+    fft_noise = fft.rfft(rng.standard_normal(data.shape, dtype=_work_dtype(data.dtype)), axis=-1, workers=-1)
+    shape = _noise_shape(n, color)
+    if shape is not None:
+        fft_noise *= shape
+    colored_noise = fft.irfft(fft_noise, n, axis=-1, workers=-1)
+    signal_power = np.mean(data ** 2, axis=-1, keepdims=True)
+    noise_power = np.mean(colored_noise ** 2, axis=-1, keepdims=True)
     target_noise_power = signal_power / 10 ** (snr_db / 10)
-    scale = np.sqrt(target_noise_power / (noise_power + 1e-10))
-    return data + colored_noise * scale
+    colored_noise *= np.sqrt(target_noise_power / (noise_power + 1e-10))
+    return np.add(data, colored_noise, out=out)
 
-def add_sensor_drift(data: np.ndarray, drift_rate: float=0.001, drift_type: str='linear', random_state: Optional[int]=None) -> np.ndarray:
+def add_sensor_drift(data: np.ndarray, drift_rate: float=0.001, drift_type: str='linear', random_state: Optional[Union[int, np.random.Generator]]=None, out: Optional[np.ndarray]=None) -> np.ndarray:
     rng = np.random.default_rng(random_state)
     n = len(data)
-    t = np.arange(n)
     amplitude = np.std(data) * drift_rate * n
+    if amplitude == 0 or drift_type not in ('linear', 'exponential', 'sinusoidal'):
+        return _unchanged(data, out)
+    if drift_type == 'sinusoidal':
+        period = rng.uniform(0.5, 2.0) * n
+    if rng.random() < 0.5:
+        amplitude = -amplitude
     if drift_type == 'linear':
-        drift = amplitude * t / n
+        drift = _arange(n) * (amplitude / n)
     elif drift_type == 'exponential':
-        drift = amplitude * (np.exp(t / n) - 1) / (np.e - 1)
-    elif drift_type == 'sinusoidal':
-        period = rng.uniform(0.5, 2.0) * n
-        drift = amplitude * np.sin(2 * np.pi * t / period)
+        drift = np.expm1(_arange(n) / n)
+        drift *= amplitude / (np.e - 1)
     else:
-        drift = 0
-    if rng.random() < 0.5:
-        drift = -drift
-    return data + drift
+        drift = np.sin(_arange(n) * (2 * np.pi / period))
+        drift *= amplitude
+    return np.add(data, drift, out=out)
 
-def time_stretch(data: np.ndarray, rate: float=1.0, random_state: Optional[int]=None) -> np.ndarray:
+def _into(result: np.ndarray, out: Optional[np.ndarray]) -> np.ndarray:
+    if out is None:
+        return result
+    np.copyto(out, result)
+    return out
+
+def _unchanged(data: np.ndarray, out: Optional[np.ndarray]) -> np.ndarray:
+    return data.copy() if out is None else _into(data, out)
+
+def time_stretch(data: np.ndarray, rate: float=1.0, random_state: Optional[Union[int, np.random.Generator]]=None, out: Optional[np.ndarray]=None) -> np.ndarray:
     if abs(rate - 1.0) < 1e-06:
-        return data.copy()
+        return _unchanged(data, out)
     n = len(data)
-    t_original = np.arange(n)
-    t_stretched = np.arange(n) * rate
-    f = interpolate.interp1d(t_original, data, kind='linear', fill_value='extrapolate')
-    stretched = f(t_stretched % n)
-    return stretched
+    t_stretched = np.multiply(_arange(n), rate)
+    np.remainder(t_stretched, n, out=t_stretched)
+    return _into(np.interp(t_stretched, _arange(n + 1), np.append(data, 2 * data[-1] - data[-2])), out)
 
-def time_shift(data: np.ndarray, shift_fraction: Optional[float]=None, random_state: Optional[int]=None) -> np.ndarray:
+def time_shift(data: np.ndarray, shift_fraction: Optional[float]=None, random_state: Optional[Union[int, np.random.Generator]]=None, out: Optional[np.ndarray]=None) -> np.ndarray:
     rng = np.random.default_rng(random_state)
     if shift_fraction is None:
         shift_fraction = rng.uniform(-0.5, 0.5)
     n = len(data)
-    shift = int(shift_fraction * n)
-    return np.roll(data, shift)
+    shift = int(shift_fraction * n) % n
+    if shift == 0:
+        return _unchanged(data, out)
+    if out is None:
+        return np.roll(data, shift)
+    out[shift:] = data[:n - shift]
+    out[:shift] = data[n - shift:]
+    return out
 
-def amplitude_scale(data: np.ndarray, scale_range: Tuple[float, float]=(0.8, 1.2), random_state: Optional[int]=None) -> np.ndarray:
+def amplitude_scale(data: np.ndarray, scale_range: Tuple[float, float]=(0.8, 1.2), random_state: Optional[Union[int, np.random.Generator]]=None, out: Optional[np.ndarray]=None) -> np.ndarray:
     rng = np.random.default_rng(random_state)
     scale = rng.uniform(scale_range[0], scale_range[1])
-    return data * scale
+    return np.multiply(data, scale, out=out)
 
-def amplitude_warp(data: np.ndarray, n_knots: int=4, magnitude: float=0.2, random_state: Optional[int]=None) -> np.ndarray:
+def amplitude_warp(data: np.ndarray, n_knots: int=4, magnitude: float=0.2, random_state: Optional[Union[int, np.random.Generator]]=None) -> np.ndarray:
     rng = np.random.default_rng(random_state)
     n = len(data)
     knot_positions = np.linspace(0, n - 1, n_knots)
     knot_values = 1.0 + rng.uniform(-magnitude, magnitude, n_knots)
     knot_values[0] = 1.0
     knot_values[-1] = 1.0
-    f = interpolate.interp1d(knot_positions, knot_values, kind='cubic')
-    warp_curve = f(np.arange(n))
+    if n_knots == 4:
+        warp_curve = _cubic_basis(n) @ knot_values
+    else:
+        warp_curve = interpolate.CubicSpline(knot_positions, knot_values)(_arange(n))
     return data * warp_curve
 
-def frequency_mask(data: np.ndarray, mask_fraction: float=0.1, num_masks: int=1, random_state: Optional[int]=None) -> np.ndarray:
+def frequency_mask(data: np.ndarray, mask_fraction: float=0.1, num_masks: int=1, random_state: Optional[Union[int, np.random.Generator]]=None, out: Optional[np.ndarray]=None) -> np.ndarray:
     rng = np.random.default_rng(random_state)
-    n = len(data)
-    fft_data = np.fft.rfft(data)
-    n_freq = len(fft_data)
+    n = data.shape[-1]
+    fft_data = fft.rfft(data, axis=-1, workers=-1)
+    n_freq = fft_data.shape[-1]
     mask_width = int(n_freq * mask_fraction)
-    for _ in range(num_masks):
-        start = rng.integers(0, n_freq - mask_width)
-        fft_data[start:start + mask_width] = 0
-    return np.fft.irfft(fft_data, n)
+    starts = rng.integers(0, n_freq - mask_width, size=fft_data.shape[:-1] + (num_masks,))
+    offsets = np.arange(n_freq) - starts[..., None]
+    fft_data[((offsets >= 0) & (offsets < mask_width)).any(axis=-2)] = 0
+    return _into(fft.irfft(fft_data, n, axis=-1, workers=-1), out)
 
-def frequency_shift(data: np.ndarray, shift_hz: float=0.0, sample_rate: float=1000.0, random_state: Optional[int]=None) -> np.ndarray:
+def frequency_shift(data: np.ndarray, shift_hz: float=0.0, sample_rate: float=1000.0, random_state: Optional[Union[int, np.random.Generator]]=None) -> np.ndarray:
     rng = np.random.default_rng(random_state)
     if shift_hz == 0.0:
         shift_hz = rng.uniform(-10, 10)
-    n = len(data)
-    t = np.arange(n) / sample_rate
-    shifted = data * np.cos(2 * np.pi * shift_hz * t)
-    return shifted
+    modulation = np.multiply(_arange(len(data)), 2 * np.pi * shift_hz / sample_rate)
+    np.cos(modulation, out=modulation)
+    return np.multiply(data, modulation, out=modulation)
 
 def simulate_resonance(data: np.ndarray, resonance_freq: float=200.0, q_factor: float=10.0, gain: float=2.0, sample_rate: float=1000.0) -> np.ndarray:
-    nyquist = sample_rate / 2
-    if resonance_freq >= nyquist:
+    sos = _resonance_filter(resonance_freq, q_factor, sample_rate)
+    if sos is None:
         return data.copy()
-    bandwidth = resonance_freq / q_factor
-    low = max((resonance_freq - bandwidth / 2) / nyquist, 0.01)
-    high = min((resonance_freq + bandwidth / 2) / nyquist, 0.99)
-    if low >= high:
-        return data.copy()
-    b, a = signal.butter(2, [low, high], btype='band')
-    resonance_component = signal.filtfilt(b, a, data)
+    resonance_component = signal.sosfiltfilt(sos, data)
     return data + resonance_component * (gain - 1)
 
-def add_harmonics(data: np.ndarray, fundamental_freq: float=60.0, harmonic_gains: List[float]=[0.0, 0.1, 0.05, 0.02], sample_rate: float=1000.0, random_state: Optional[int]=None) -> np.ndarray:
+def add_harmonics(data: np.ndarray, fundamental_freq: float=60.0, harmonic_gains: List[float]=[0.0, 0.1, 0.05, 0.02], sample_rate: float=1000.0, random_state: Optional[Union[int, np.random.Generator]]=None) -> np.ndarray:
     rng = np.random.default_rng(random_state)
-    n = len(data)
-    t = np.arange(n) / sample_rate
-    augmented = data.copy()
+    t = _arange(len(data))
+    augmented = data.astype(_work_dtype(data.dtype), copy=True)
+    harmonic = np.empty_like(t)
     amplitude = np.std(data)
     for i, gain in enumerate(harmonic_gains):
         if gain > 0:
-            freq = (i + 1) * fundamental_freq
             phase = rng.uniform(0, 2 * np.pi)
-            harmonic = amplitude * gain * np.sin(2 * np.pi * freq * t + phase)
-            augmented = augmented + harmonic
+            np.multiply(t, 2 * np.pi * (i + 1) * fundamental_freq / sample_rate, out=harmonic)
+            harmonic += phase
+            np.sin(harmonic, out=harmonic)
+            harmonic *= amplitude * gain
+            augmented += harmonic
     return augmented
 
-def add_impulse_noise(data: np.ndarray, impulse_rate: float=0.001, impulse_amplitude: float=3.0, random_state: Optional[int]=None) -> np.ndarray:
+def add_impulse_noise(data: np.ndarray, impulse_rate: float=0.001, impulse_amplitude: float=3.0, random_state: Optional[Union[int, np.random.Generator]]=None) -> np.ndarray:
     rng = np.random.default_rng(random_state)
     n = len(data)
-    impulses = rng.random(n) < impulse_rate
-    amplitude = np.std(data) * impulse_amplitude
-    impulse_values = rng.choice([-1, 1], n) * amplitude * impulses
-    return data + impulse_values
+    augmented = data.astype(_work_dtype(data.dtype), copy=True)
+    k = int(rng.binomial(n, impulse_rate))
+    if k == 0:
+        return augmented
+    positions = rng.choice(n, size=k, replace=False)
+    signs = rng.integers(0, 2, size=k) * 2 - 1
+    augmented[positions] += signs * (np.std(data) * impulse_amplitude)
+    return augmented
 
-def mixup(data1: np.ndarray, data2: np.ndarray, alpha: float=0.2, random_state: Optional[int]=None) -> Tuple[np.ndarray, float]:
+def mixup(data1: np.ndarray, data2: np.ndarray, alpha: float=0.2, random_state: Optional[Union[int, np.random.Generator]]=None) -> Tuple[np.ndarray, float]:
     rng = np.random.default_rng(random_state)
     lam = rng.beta(alpha, alpha)
     min_len = min(len(data1), len(data2))
     mixed = lam * data1[:min_len] + (1 - lam) * data2[:min_len]
     return (mixed, lam)
 
-def cutout(data: np.ndarray, mask_fraction: float=0.1, num_masks: int=1, random_state: Optional[int]=None) -> np.ndarray:
+def cutout(data: np.ndarray, mask_fraction: float=0.1, num_masks: int=1, random_state: Optional[Union[int, np.random.Generator]]=None) -> np.ndarray:
     rng = np.random.default_rng(random_state)
     augmented = data.copy()
     n = len(data)
@@ -154,16 +221,21 @@ def cutout(data: np.ndarray, mask_fraction: float=0.1, num_masks: int=1, random_
         augmented[start:start + mask_length] = 0
     return augmented
 
-def jitter(data: np.ndarray, sigma: float=0.03, random_state: Optional[int]=None) -> np.ndarray:
+def jitter(data: np.ndarray, sigma: float=0.03, random_state: Optional[Union[int, np.random.Generator]]=None, out: Optional[np.ndarray]=None) -> np.ndarray:
     rng = np.random.default_rng(random_state)
-    noise = rng.normal(0, sigma * np.std(data), data.shape)
-    return data + noise
+    scale = sigma * np.std(data)
+    out = _noise_buffer(data, out)
+    rng.standard_normal(out=out, dtype=out.dtype)
+    out *= scale
+    out += data
+    return out
 
 class VibrationAugmenter:
 
-    def __init__(self, sample_rate: float=1000.0, random_state: Optional[int]=None):
+    def __init__(self, sample_rate: float=1000.0, random_state: Optional[Union[int, np.random.Generator]]=None):
         self.sample_rate = sample_rate
         self.rng = np.random.default_rng(random_state)
+        self._scratch = None
         self.augmentations = {'gaussian_noise': {'enabled': True, 'prob': 0.5, 'params': {'snr_db': (15, 30)}}, 'amplitude_scale': {'enabled': True, 'prob': 0.5, 'params': {'scale_range': (0.8, 1.2)}}, 'time_shift': {'enabled': True, 'prob': 0.3, 'params': {'shift_fraction': (-0.2, 0.2)}}, 'time_stretch': {'enabled': True, 'prob': 0.3, 'params': {'rate': (0.9, 1.1)}}, 'sensor_drift': {'enabled': True, 'prob': 0.2, 'params': {'drift_rate': (0.0005, 0.002)}}, 'frequency_mask': {'enabled': True, 'prob': 0.2, 'params': {'mask_fraction': 0.1, 'num_masks': 1}}, 'jitter': {'enabled': True, 'prob': 0.3, 'params': {'sigma': (0.01, 0.05)}}}
 
     def configure(self, augmentation_name: str, **kwargs):
@@ -184,8 +256,15 @@ class VibrationAugmenter:
         for aug in self.augmentations.values():
             aug['prob'] = prob
 
+    def _scratch_buffers(self, data: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        dtype = _work_dtype(data.dtype)
+        if self._scratch is None or self._scratch[0].shape != data.shape or self._scratch[0].dtype != dtype:
+            self._scratch = (np.empty(data.shape, dtype=dtype), np.empty(data.shape, dtype=dtype))
+        return self._scratch
+
     def augment(self, data: np.ndarray) -> np.ndarray:
-        augmented = data.copy()
+        augmented, spare = self._scratch_buffers(data)
+        np.copyto(augmented, data)
         for name, config in self.augmentations.items():
             if not config['enabled']:
                 continue
@@ -194,34 +273,70 @@ class VibrationAugmenter:
             params = config['params']
             if name == 'gaussian_noise':
                 snr = self.rng.uniform(*params['snr_db'])
-                augmented = add_gaussian_noise(augmented, snr)
+                add_gaussian_noise(augmented, snr, random_state=self.rng, out=spare)
             elif name == 'amplitude_scale':
-                augmented = amplitude_scale(augmented, params['scale_range'], random_state=self.rng.integers(0, 2 ** 31))
+                amplitude_scale(augmented, params['scale_range'], random_state=self.rng, out=spare)
             elif name == 'time_shift':
                 shift = self.rng.uniform(*params['shift_fraction'])
-                augmented = time_shift(augmented, shift)
+                time_shift(augmented, shift, out=spare)
             elif name == 'time_stretch':
                 rate = self.rng.uniform(*params['rate'])
-                augmented = time_stretch(augmented, rate)
+                time_stretch(augmented, rate, out=spare)
             elif name == 'sensor_drift':
                 drift = self.rng.uniform(*params['drift_rate'])
-                augmented = add_sensor_drift(augmented, drift, random_state=self.rng.integers(0, 2 ** 31))
+                add_sensor_drift(augmented, drift, random_state=self.rng, out=spare)
             elif name == 'frequency_mask':
-                augmented = frequency_mask(augmented, params['mask_fraction'], params['num_masks'], random_state=self.rng.integers(0, 2 ** 31))
+                frequency_mask(augmented, params['mask_fraction'], params['num_masks'], random_state=self.rng, out=spare)
             elif name == 'jitter':
                 sigma = self.rng.uniform(*params['sigma'])
-                augmented = jitter(augmented, sigma, random_state=self.rng.integers(0, 2 ** 31))
-        return augmented
+                jitter(augmented, sigma, random_state=self.rng, out=spare)
+            else:
+                continue
+            augmented, spare = (spare, augmented)
+        return augmented.copy()
+
+    def _augment_rows(self, name: str, params: dict, rows: np.ndarray) -> np.ndarray:
+        k, n = rows.shape
+        dtype = rows.dtype
+        if name == 'gaussian_noise':
+            snr = self.rng.uniform(*params['snr_db'], size=(k, 1))
+            noise_scale = np.sqrt(np.mean(rows ** 2, axis=1, keepdims=True) / 10 ** (snr / 10)).astype(dtype)
+            return rows + self.rng.standard_normal(rows.shape, dtype=dtype) * noise_scale
+        if name == 'amplitude_scale':
+            return rows * self.rng.uniform(*params['scale_range'], size=(k, 1)).astype(dtype)
+        if name == 'time_shift':
+            shifts = (self.rng.uniform(*params['shift_fraction'], size=(k, 1)) * n).astype(np.int64)
+            return np.take_along_axis(rows, (np.arange(n) - shifts) % n, axis=1)
+        if name == 'time_stretch':
+            rates = self.rng.uniform(*params['rate'], size=(k, 1))
+            positions = _arange(n) * rates % n
+            left = np.minimum(positions.astype(np.int64), n - 2)
+            lower = np.take_along_axis(rows, left, axis=1)
+            upper = np.take_along_axis(rows, left + 1, axis=1)
+            stretched = lower + (positions - left).astype(dtype) * (upper - lower)
+            return np.where(np.abs(rates - 1.0) < 1e-06, rows, stretched)
+        if name == 'sensor_drift':
+            drift = self.rng.uniform(*params['drift_rate'], size=(k, 1))
+            amplitude = np.std(rows, axis=1, keepdims=True) * drift * n
+            amplitude[self.rng.random(k) < 0.5] *= -1
+            return rows + (amplitude * (_arange(n) / n)).astype(dtype)
+        if name == 'frequency_mask':
+            return frequency_mask(rows, params['mask_fraction'], params['num_masks'], random_state=self.rng)
+        if name == 'jitter':
+            sigma = self.rng.uniform(*params['sigma'], size=(k, 1))
+            noise_scale = (sigma * np.std(rows, axis=1, keepdims=True)).astype(dtype)
+            return rows + self.rng.standard_normal(rows.shape, dtype=dtype) * noise_scale
+        return rows
 
     def augment_batch(self, data_batch: np.ndarray, n_augmentations: int=1) -> np.ndarray:
-        n_samples, signal_length = data_batch.shape
-        total_samples = n_samples * n_augmentations
-        augmented_batch = np.zeros((total_samples, signal_length), dtype=data_batch.dtype)
-        for i in range(n_samples):
-            for j in range(n_augmentations):
-                idx = i * n_augmentations + j
-                augmented_batch[idx] = self.augment(data_batch[i])
-        return augmented_batch
+        augmented_batch = np.repeat(data_batch.astype(_work_dtype(data_batch.dtype), copy=False), n_augmentations, axis=0)
+        for name, config in self.augmentations.items():
+            if not config['enabled']:
+                continue
+            active = np.flatnonzero(self.rng.random(len(augmented_batch)) <= config['prob'])
+            if active.size:
+                augmented_batch[active] = self._augment_rows(name, config['params'], augmented_batch[active])
+        return augmented_batch.astype(data_batch.dtype, copy=False)
 
     def augment_with_labels(self, data: np.ndarray, labels: np.ndarray, n_augmentations: int=1) -> Tuple[np.ndarray, np.ndarray]:
         augmented_data = self.augment_batch(data, n_augmentations)
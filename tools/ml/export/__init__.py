@@ -1,4 +1,4 @@
 from .tflite_converter import convert_to_tflite, generate_c_header, analyze_tflite_model, validate_tflite_model, TFLiteModelExporter
 from .normalization_export import compute_normalization_params, export_normalization_json, export_normalization_header, generate_feature_config, NormalizationExporter
 from .model_versioning import compute_file_hash, ModelVersion, ModelRegistry, generate_version_string, increment_version
-from .metrics import accuracy, confusion_matrix, precision_recall_f1, classification_report, print_classification_report, rul_metrics, compute_pr_curve, compute_roc_curve, compute_auc, multiclass_roc_auc, MetricsLogger, evaluate_model
\ No newline at end of file
+from .metrics import accuracy, confusion_matrix, precision_recall_f1, classification_report, print_classification_report, to_jsonable, rul_metrics, compute_pr_curve, compute_roc_curve, compute_auc, multiclass_roc_auc, MetricsLogger, evaluate_model
\ No newline at end of file
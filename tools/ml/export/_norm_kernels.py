@@ -0,0 +1,25 @@
+import numpy as np
+from typing import Optional
+PARALLEL_MIN_ROWS = 4096
+
+def _affine_rows(X, offset, inv_scale, out):
+    n_features = X.shape[1]
+    for i in prange(X.shape[0]):
+        for j in range(n_features):
+            out[i, j] = (X[i, j] - offset[j]) * inv_scale[j]
+try:
+    from numba import njit, prange
+    _AFFINE_SIGNATURES = ['void(float32[:, ::1], float64[::1], float64[::1], float64[:, ::1])', 'void(float64[:, ::1], float64[::1], float64[::1], float64[:, ::1])']
+    affine_rows_serial = njit(_AFFINE_SIGNATURES, fastmath=True, cache=True)(_affine_rows)
+    affine_rows_parallel = njit(_AFFINE_SIGNATURES, parallel=True, fastmath=True, cache=True)(_affine_rows)
+except ImportError:
+    affine_rows_serial = None
+    affine_rows_parallel = None
+
+def affine_rows(X: np.ndarray, offset: np.ndarray, inv_scale: np.ndarray) -> Optional[np.ndarray]:
+    if affine_rows_serial is None or X.ndim != 2 or X.shape[1] != offset.shape[0] or X.dtype not in (np.float32, np.float64):
+        return None
+    X = np.ascontiguousarray(X)
+    out = np.empty(X.shape, dtype=np.float64)
+    (affine_rows_parallel if X.shape[0] >= PARALLEL_MIN_ROWS else affine_rows_serial)(X, offset, inv_scale, out)
+    return out
\ No newline at end of file
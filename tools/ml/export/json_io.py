@@ -0,0 +1,24 @@
+import json
+from typing import Any
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _default(obj: Any) -> Any:
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    return str(obj)
+
+def dump_json(obj: Any, path) -> None:
+    if orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(obj, default=_default, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS))
+    else:
+        with open(path, 'w') as f:
+            json.dump(obj, f, indent=2, default=_default)
+
+def load_json(path) -> Any:
+    with open(path, 'rb') as f:
+        data = f.read()
+    return orjson.loads(data) if orjson is not None else json.loads(data)
\ No newline at end of file
@@ -6,31 +6,29 @@ def accuracy(y_true: np.ndarray, y_pred: np.ndarray) -> float:
     return float(np.mean(y_true == y_pred))
 
 def confusion_matrix(y_true: np.ndarray, y_pred: np.ndarray, num_classes: int=None) -> np.ndarray:
+    y_true = np.asarray(y_true).astype(np.int64, copy=False)
+    y_pred = np.asarray(y_pred).astype(np.int64, copy=False)
     if num_classes is None:
-        num_classes = max(y_true.max(), y_pred.max()) + 1
-    cm = np.zeros((num_classes, num_classes), dtype=np.int64)
-    for t, p in zip(y_true, y_pred):
-        cm[int(t), int(p)] += 1
-    return cm
-
-def precision_recall_f1(y_true: np.ndarray, y_pred: np.ndarray, average: str='macro') -> Tuple[float, float, float]:
-    cm = confusion_matrix(y_true, y_pred)
-    num_classes = cm.shape[0]
-    precisions = []
-    recalls = []
-    f1s = []
-    supports = []
-    for i in range(num_classes):
-        tp = cm[i, i]
-        fp = cm[:, i].sum() - tp
-        fn = cm[i, :].sum() - tp
-        precision = tp / (tp + fp) if tp + fp > 0 else 0.0
-        recall = tp / (tp + fn) if tp + fn > 0 else 0.0
-        f1 = 2 * precision * recall / (precision + recall) if precision + recall > 0 else 0.0
-        precisions.append(precision)
-        recalls.append(recall)
-        f1s.append(f1)
-        supports.append(cm[i, :].sum())
+        num_classes = int(max(y_true.max(), y_pred.max())) + 1
+    cm = np.bincount(y_true * num_classes + y_pred, minlength=num_classes * num_classes)
+    return cm.astype(np.int64, copy=False).reshape(num_classes, num_classes)
+
+def _safe_divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    return np.divide(numerator, denominator, out=np.zeros(np.shape(numerator), dtype=np.float64), where=denominator > 0)
+
+def _per_class_stats(cm: np.ndarray) -> Dict[str, np.ndarray]:
+    tp = np.diag(cm)
+    support = cm.sum(axis=1)
+    fp = cm.sum(axis=0) - tp
+    fn = support - tp
+    tn = cm.sum() - tp - fp - fn
+    precision = _safe_divide(tp, tp + fp)
+    recall = _safe_divide(tp, tp + fn)
+    f1 = _safe_divide(2 * precision * recall, precision + recall)
+    specificity = _safe_divide(tn, tn + fp)
+    return {'tp': tp, 'fp': fp, 'fn': fn, 'tn': tn, 'support': support, 'precision': precision, 'recall': recall, 'f1': f1, 'specificity': specificity}
+
+def _average_scores(cm: np.ndarray, stats: Dict[str, np.ndarray], average: str) -> Tuple[float, float, float]:
     if average == 'micro':
         tp_total = np.trace(cm)
         total = cm.sum()
@@ -38,46 +36,45 @@ def precision_recall_f1(y_true: np.ndarray, y_pred: np.ndarray, average: str='ma
         recall = precision
         f1 = precision
     elif average == 'weighted':
-        total = sum(supports)
+        supports = stats['support']
+        total = supports.sum()
         if total > 0:
-            precision = sum((p * s for p, s in zip(precisions, supports))) / total
-            recall = sum((r * s for r, s in zip(recalls, supports))) / total
-            f1 = sum((f * s for f, s in zip(f1s, supports))) / total
+            precision = np.dot(stats['precision'], supports) / total
+            recall = np.dot(stats['recall'], supports) / total
+            f1 = np.dot(stats['f1'], supports) / total
         else:
             precision = recall = f1 = 0.0
     else:
-        precision = np.mean(precisions)
-        recall = np.mean(recalls)
-        f1 = np.mean(f1s)
+        precision = stats['precision'].mean()
+        recall = stats['recall'].mean()
+        f1 = stats['f1'].mean()
     return (float(precision), float(recall), float(f1))
 
+def precision_recall_f1(y_true: np.ndarray, y_pred: np.ndarray, average: str='macro') -> Tuple[float, float, float]:
+    cm = confusion_matrix(y_true, y_pred)
+    return _average_scores(cm, _per_class_stats(cm), average)
+
 def classification_report(y_true: np.ndarray, y_pred: np.ndarray, class_names: List[str]=None) -> Dict[str, Any]:
     cm = confusion_matrix(y_true, y_pred)
     num_classes = cm.shape[0]
     if class_names is None:
         class_names = [f'Class {i}' for i in range(num_classes)]
-    report = {'classes': {}, 'overall': {}, 'confusion_matrix': cm.tolist()}
-    for i in range(num_classes):
-        tp = cm[i, i]
-        fp = cm[:, i].sum() - tp
-        fn = cm[i, :].sum() - tp
-        tn = cm.sum() - tp - fp - fn
-        precision = tp / (tp + fp) if tp + fp > 0 else 0.0
-        recall = tp / (tp + fn) if tp + fn > 0 else 0.0
-        f1 = 2 * precision * recall / (precision + recall) if precision + recall > 0 else 0.0
-        specificity = tn / (tn + fp) if tn + fp > 0 else 0.0
-        report['classes'][class_names[i]] = {'precision': float(precision), 'recall': float(recall), 'f1_score': float(f1), 'specificity': float(specificity), 'support': int(cm[i, :].sum()), 'true_positives': int(tp), 'false_positives': int(fp), 'false_negatives': int(fn), 'true_negatives': int(tn)}
-    report['overall']['accuracy'] = accuracy(y_true, y_pred)
-    macro_p, macro_r, macro_f1 = precision_recall_f1(y_true, y_pred, 'macro')
-    report['overall']['macro_precision'] = macro_p
-    report['overall']['macro_recall'] = macro_r
-    report['overall']['macro_f1'] = macro_f1
-    weighted_p, weighted_r, weighted_f1 = precision_recall_f1(y_true, y_pred, 'weighted')
-    report['overall']['weighted_precision'] = weighted_p
-    report['overall']['weighted_recall'] = weighted_r
-    report['overall']['weighted_f1'] = weighted_f1
-    report['overall']['total_samples'] = len(y_true)
-    return report
+    stats = _per_class_stats(cm)
+    columns = zip(stats['precision'].tolist(), stats['recall'].tolist(), stats['f1'].tolist(), stats['specificity'].tolist(), stats['support'].tolist(), stats['tp'].tolist(), stats['fp'].tolist(), stats['fn'].tolist(), stats['tn'].tolist())
+    classes = {name: {'precision': p, 'recall': r, 'f1_score': f, 'specificity': sp, 'support': n, 'true_positives': tp, 'false_positives': fp, 'false_negatives': fn, 'true_negatives': tn} for name, (p, r, f, sp, n, tp, fp, fn, tn) in zip(class_names, columns)}
+    macro_p, macro_r, macro_f1 = _average_scores(cm, stats, 'macro')
+    weighted_p, weighted_r, weighted_f1 = _average_scores(cm, stats, 'weighted')
+    overall = {'accuracy': accuracy(y_true, y_pred), 'macro_precision': macro_p, 'macro_recall': macro_r, 'macro_f1': macro_f1, 'weighted_precision': weighted_p, 'weighted_recall': weighted_r, 'weighted_f1': weighted_f1, 'total_samples': len(y_true)}
+    return {'classes': classes, 'overall': overall, 'confusion_matrix': cm}
+
+def to_jsonable(obj: Any) -> Any:
+    if isinstance(obj, dict):
+        return {key: to_jsonable(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [to_jsonable(value) for value in obj]
+    if isinstance(obj, (np.ndarray, np.generic)):
+        return obj.tolist()
+    return obj
 
 def print_classification_report(report: Dict[str, Any]):
     print('\n' + '=' * 70)
@@ -99,46 +96,25 @@ def print_classification_report(report: Dict[str, Any]):
 
 def rul_metrics(y_true: np.ndarray, y_pred: np.ndarray) -> Dict[str, float]:
     errors = y_pred - y_true
-    metrics = {'mae': float(np.mean(np.abs(errors))), 'mse': float(np.mean(errors ** 2)), 'rmse': float(np.sqrt(np.mean(errors ** 2))), 'mape': float(np.mean(np.abs(errors / (y_true + 1e-10))) * 100), 'r2': float(1 - np.sum(errors ** 2) / np.sum((y_true - y_true.mean()) ** 2)), 'mean_error': float(np.mean(errors)), 'std_error': float(np.std(errors))}
-    scores = []
-    for e in errors:
-        if e < 0:
-            scores.append(np.exp(-e / 13) - 1)
-        else:
-            scores.append(np.exp(e / 10) - 1)
-    metrics['phm_score'] = float(np.sum(scores))
-    metrics['phm_avg'] = float(np.mean(scores))
+    abs_errors = np.abs(errors)
+    mse = np.mean(errors * errors)
+    metrics = {'mae': float(np.mean(abs_errors)), 'mse': float(mse), 'rmse': float(np.sqrt(mse)), 'mape': float(np.mean(np.abs(errors / (y_true + 1e-10))) * 100), 'r2': float(1 - mse * len(errors) / np.sum((y_true - y_true.mean()) ** 2)), 'mean_error': float(np.mean(errors)), 'std_error': float(np.std(errors))}
+    scores = np.expm1(abs_errors / np.where(errors < 0, 13.0, 10.0))
+    metrics['phm_score'] = float(scores.sum())
+    metrics['phm_avg'] = float(scores.mean())
     return metrics
 
-def compute_pr_curve(y_true: np.ndarray, y_scores: np.ndarray, positive_class: int=1) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
-    y_binary = (y_true == positive_class).astype(int)
-    if len(y_scores.shape) > 1:
-        scores = y_scores[:, positive_class]
-    else:
-        scores = y_scores
-    sorted_indices = np.argsort(scores)[::-1]
-    sorted_scores = scores[sorted_indices]
-    sorted_labels = y_binary[sorted_indices]
-    tp_cumsum = np.cumsum(sorted_labels)
-    fp_cumsum = np.cumsum(1 - sorted_labels)
-    precisions = tp_cumsum / (tp_cumsum + fp_cumsum)
-    recalls = tp_cumsum / sorted_labels.sum()
-    thresholds = sorted_scores
-    return (precisions, recalls, thresholds)
-
-def compute_roc_curve(y_true: np.ndarray, y_scores: np.ndarray, positive_class: int=1) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
-    y_binary = (y_true == positive_class).astype(int)
-    if len(y_scores.shape) > 1:
-        scores = y_scores[:, positive_class]
-    else:
-        scores = y_scores
-    sorted_indices = np.argsort(scores)[::-1]
-    sorted_scores = scores[sorted_indices]
-    sorted_labels = y_binary[sorted_indices]
-    n_pos = sorted_labels.sum()
-    n_neg = len(sorted_labels) - n_pos
-    tp_cumsum = np.cumsum(sorted_labels)
-    fp_cumsum = np.cumsum(1 - sorted_labels)
+def _ranked_counts(y_binary: np.ndarray, scores: np.ndarray, order: Optional[np.ndarray]=None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    if order is None:
+        order = np.argsort(scores)[::-1]
+    tp_cumsum = np.cumsum(y_binary[order])
+    ranks = np.arange(1, len(order) + 1)
+    return (scores[order], tp_cumsum, ranks)
+
+def _roc_from_ranked(sorted_scores: np.ndarray, tp_cumsum: np.ndarray, ranks: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    fp_cumsum = ranks - tp_cumsum
+    n_pos = tp_cumsum[-1]
+    n_neg = len(ranks) - n_pos
     tpr = tp_cumsum / n_pos if n_pos > 0 else np.zeros_like(tp_cumsum)
     fpr = fp_cumsum / n_neg if n_neg > 0 else np.zeros_like(fp_cumsum)
     tpr = np.concatenate([[0], tpr])
@@ -146,21 +122,36 @@ def compute_roc_curve(y_true: np.ndarray, y_scores: np.ndarray, positive_class:
     thresholds = np.concatenate([[sorted_scores[0] + 1], sorted_scores])
     return (fpr, tpr, thresholds)
 
+def compute_pr_curve(y_true: np.ndarray, y_scores: np.ndarray, positive_class: int=1) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    scores = y_scores[:, positive_class] if y_scores.ndim > 1 else y_scores
+    sorted_scores, tp_cumsum, ranks = _ranked_counts(y_true == positive_class, scores)
+    precisions = tp_cumsum / ranks
+    recalls = tp_cumsum / tp_cumsum[-1]
+    return (precisions, recalls, sorted_scores)
+
+def compute_roc_curve(y_true: np.ndarray, y_scores: np.ndarray, positive_class: int=1) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    scores = y_scores[:, positive_class] if y_scores.ndim > 1 else y_scores
+    return _roc_from_ranked(*_ranked_counts(y_true == positive_class, scores))
+
 def compute_auc(x: np.ndarray, y: np.ndarray) -> float:
-    return float(np.trapz(y, x))
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    return float(0.5 * np.dot(np.diff(x), y[1:] + y[:-1]))
 
 def multiclass_roc_auc(y_true: np.ndarray, y_scores: np.ndarray, average: str='macro') -> float:
-    classes = np.unique(y_true)
+    classes, supports = np.unique(y_true, return_counts=True)
+    order = np.argsort(y_scores, axis=0)[::-1]
     aucs = []
-    supports = []
     for c in classes:
-        fpr, tpr, _ = compute_roc_curve(y_true, y_scores, c)
+        if y_scores.ndim > 1:
+            ranked = _ranked_counts(y_true == c, y_scores[:, c], order[:, c])
+        else:
+            ranked = _ranked_counts(y_true == c, y_scores, order)
+        fpr, tpr, _ = _roc_from_ranked(*ranked)
         auc = compute_auc(fpr, tpr)
         aucs.append(auc)
-        supports.append(np.sum(y_true == c))
     if average == 'weighted':
-        total = sum(supports)
-        return sum((a * s / total for a, s in zip(aucs, supports)))
+        return float(np.dot(aucs, supports) / supports.sum())
     else:
         return float(np.mean(aucs))
 
@@ -169,19 +160,30 @@ class MetricsLogger:
     def __init__(self):
         self.history = defaultdict(list)
         self.best = {}
+        self._best_values = {}
+        self._history_arrays = {}
 
     def log(self, epoch: int, metrics: Dict[str, float]):
-        self.history['epoch'].append(epoch)
+        history = self.history
+        best_values = self._best_values
+        history['epoch'].append(epoch)
         for key, value in metrics.items():
-            self.history[key].append(value)
-            if key not in self.best or value > self.best[key]['value']:
+            history[key].append(value)
+            best = best_values.get(key)
+            if best is None or value > best:
+                best_values[key] = value
                 self.best[key] = {'value': value, 'epoch': epoch}
 
     def get_best(self, metric: str) -> Dict:
         return self.best.get(metric, None)
 
-    def get_history(self, metric: str) -> List[float]:
-        return self.history.get(metric, [])
+    def get_history(self, metric: str) -> np.ndarray:
+        values = self.history.get(metric, [])
+        cached = self._history_arrays.get(metric)
+        if cached is None or len(cached) != len(values):
+            cached = self._history_arrays[metric] = np.asarray(values, dtype=np.float64)
+            cached.flags.writeable = False
+        return cached
 
     def summary(self) -> Dict[str, Any]:
         return {'best': dict(self.best), 'final': {k: v[-1] if v else None for k, v in self.history.items()}, 'n_epochs': len(self.history.get('epoch', []))}
@@ -1,37 +1,81 @@
 import os
-import json
 import hashlib
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from functools import lru_cache, partial
+from typing import Dict, Any, List, Optional, Callable, Tuple
 from pathlib import Path
+from .json_io import dump_json, load_json
+HASH_CHUNK_SIZE = 1 << 20
+
+@lru_cache(maxsize=None)
+def _hash_factory(algorithm: str) -> Callable:
+    try:
+        import _hashlib
+        return getattr(_hashlib, f'openssl_{algorithm}')
+    except (ImportError, AttributeError):
+        return partial(hashlib.new, algorithm)
 
 def compute_file_hash(filepath: str, algorithm: str='sha256') -> str:
-    h = hashlib.new(algorithm)
-    with open(filepath, 'rb') as f:
-        for chunk in iter(lambda: f.read(8192), b''):
-            h.update(chunk)
+    h = _hash_factory(algorithm)()
+    buf = bytearray(HASH_CHUNK_SIZE)
+    view = memoryview(buf)
+    with open(filepath, 'rb', buffering=0) as f:
+        while (n := f.readinto(buf)):
+            h.update(view[:n])
     return h.hexdigest()
 
+@lru_cache(maxsize=4096)
+def _hash_by_stat(realpath: str, mtime_ns: int, size: int, algorithm: str) -> str:
+    return compute_file_hash(realpath, algorithm)
+
+def _stat_hash(filepath: str, st: os.stat_result, algorithm: str='sha256') -> str:
+    return _hash_by_stat(os.path.realpath(filepath), st.st_mtime_ns, st.st_size, algorithm)
+
+def _copy_model_file(src: str, dst: str) -> None:
+    if os.path.exists(dst) and os.path.samefile(src, dst):
+        raise shutil.SameFileError(f'{src!r} and {dst!r} are the same file')
+    try:
+        import fcntl
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            fcntl.ioctl(fdst.fileno(), getattr(fcntl, 'FICLONE', 1074041865), fsrc.fileno())
+    except (ImportError, OSError):
+        shutil.copyfile(src, dst)
+    shutil.copystat(src, dst)
+
+def _warm_hash(filepath: str) -> Optional[str]:
+    try:
+        return _stat_hash(filepath, os.stat(filepath))
+    except OSError:
+        return None
+
 class ModelVersion:
 
-    def __init__(self, version: str, model_path: str, metrics: Dict[str, float]=None, metadata: Dict[str, Any]=None):
+    def __init__(self, version: str, model_path: str, metrics: Dict[str, float]=None, metadata: Dict[str, Any]=None, file_hash: Optional[str]=None):
         self.version = version
         self.model_path = model_path
         self.metrics = metrics or {}
         self.metadata = metadata or {}
         self.created_at = datetime.now().isoformat()
         self.hash = None
-        if os.path.exists(model_path):
-            self.hash = compute_file_hash(model_path)
-            self.size_bytes = os.path.getsize(model_path)
+        try:
+            st = os.stat(model_path)
+        except OSError:
+            return
+        self.hash = file_hash or _stat_hash(model_path, st)
+        self.size_bytes = st.st_size
 
     def to_dict(self) -> Dict:
         return {'version': self.version, 'model_path': self.model_path, 'metrics': self.metrics, 'metadata': self.metadata, 'created_at': self.created_at, 'hash': self.hash, 'size_bytes': getattr(self, 'size_bytes', None)}
 
     @classmethod
     def from_dict(cls, data: Dict) -> 'ModelVersion':
-        mv = cls(version=data['version'], model_path=data['model_path'], metrics=data.get('metrics', {}), metadata=data.get('metadata', {}))
+        mv = cls.__new__(cls)
+        mv.version = data['version']
+        mv.model_path = data['model_path']
+        mv.metrics = data.get('metrics') or {}
+        mv.metadata = data.get('metadata') or {}
         mv.created_at = data.get('created_at')
         mv.hash = data.get('hash')
         mv.size_bytes = data.get('size_bytes')
@@ -49,30 +93,41 @@ class ModelRegistry:
 
     def _load_registry(self) -> Dict:
         if self.registry_file.exists():
-            with open(self.registry_file) as f:
-                return json.load(f)
+            return load_json(self.registry_file)
         return {'models': {}, 'current_production': None, 'history': []}
 
     def _save_registry(self):
-        with open(self.registry_file, 'w') as f:
-            json.dump(self.registry, f, indent=2)
+        dump_json(self.registry, self.registry_file)
 
     def register_model(self, model_name: str, model_path: str, version: str=None, metrics: Dict[str, float]=None, metadata: Dict[str, Any]=None, copy_to_registry: bool=True) -> ModelVersion:
+        model_version = self._add_version(model_name, model_path, version, metrics, metadata, copy_to_registry)
+        self._save_registry()
+        return model_version
+
+    def register_models_bulk(self, items: List[Tuple[str, str, Optional[Dict[str, float]]]], copy_to_registry: bool=True) -> List[ModelVersion]:
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
+            list(pool.map(_warm_hash, dict.fromkeys((path for _, path, _ in items))))
+        versions = [self._add_version(model_name, model_path, None, metrics, None, copy_to_registry) for model_name, model_path, metrics in items]
+        self._save_registry()
+        return versions
+
+    def _add_version(self, model_name: str, model_path: str, version: Optional[str], metrics: Optional[Dict[str, float]], metadata: Optional[Dict[str, Any]], copy_to_registry: bool) -> ModelVersion:
         if model_name not in self.registry['models']:
             self.registry['models'][model_name] = {'versions': [], 'latest': None, 'production': None}
         if version is None:
             existing = len(self.registry['models'][model_name]['versions'])
             version = f'v{existing + 1}.0.0'
+        file_hash = None
         if copy_to_registry:
             model_filename = f'{model_name}_{version}{Path(model_path).suffix}'
             dest_path = self.models_dir / model_filename
-            shutil.copy2(model_path, dest_path)
+            file_hash = _stat_hash(model_path, os.stat(model_path))
+            _copy_model_file(model_path, dest_path)
             model_path = str(dest_path)
-        model_version = ModelVersion(version=version, model_path=model_path, metrics=metrics, metadata=metadata)
+        model_version = ModelVersion(version=version, model_path=model_path, metrics=metrics, metadata=metadata, file_hash=file_hash)
         self.registry['models'][model_name]['versions'].append(model_version.to_dict())
         self.registry['models'][model_name]['latest'] = version
         self.registry['history'].append({'action': 'register', 'model_name': model_name, 'version': version, 'timestamp': datetime.now().isoformat()})
-        self._save_registry()
         print(f'Registered {model_name} {version}')
         if metrics:
             for k, v in metrics.items():
@@ -1,35 +1,49 @@
 import numpy as np
 from typing import Dict, List, Optional, Any
 from datetime import datetime
-import json
+from .json_io import dump_json
+from ._norm_kernels import affine_rows
 
-def compute_normalization_params(X: np.ndarray, feature_names: List[str]=None, method: str='zscore') -> Dict[str, Any]:
+def compute_normalization_params(X: np.ndarray, feature_names: List[str]=None, method: str='zscore', quant_stats: Dict[str, Any]=None) -> Dict[str, Any]:
     n_features = X.shape[1] if len(X.shape) > 1 else 1
     params = {'method': method, 'n_features': n_features, 'feature_names': feature_names or [f'feature_{i}' for i in range(n_features)], 'computed_from_samples': len(X), 'timestamp': datetime.now().isoformat()}
-    if method == 'zscore':
-        params['mean'] = X.mean(axis=0).tolist()
-        params['std'] = X.std(axis=0).tolist()
-        params['std'] = [max(s, 1e-07) for s in params['std']]
+    if method in ('zscore', 'zscore_int8'):
+        mean = X.mean(axis=0)
+        centered = X - mean
+        params['mean'] = mean
+        params['std'] = np.maximum(np.sqrt(np.einsum('ij,ij->j', centered, centered) / len(X)), 1e-07)
+        if method == 'zscore_int8':
+            if not quant_stats or 'input_scale' not in quant_stats or 'input_zero_point' not in quant_stats:
+                raise ValueError('zscore_int8 requires quant_stats with input_scale and input_zero_point')
+            params['input_scale'] = float(quant_stats['input_scale'])
+            params['input_zero_point'] = int(quant_stats['input_zero_point'])
+            params['quant_mul'] = 1.0 / (params['std'] * params['input_scale'])
+            params['quant_bias'] = params['input_zero_point'] - mean * params['quant_mul']
     elif method == 'minmax':
-        params['min'] = X.min(axis=0).tolist()
-        params['max'] = X.max(axis=0).tolist()
-        params['range'] = [ma - mi if ma - mi > 1e-07 else 1.0 for mi, ma in zip(params['min'], params['max'])]
+        params['min'] = X.min(axis=0)
+        params['max'] = X.max(axis=0)
+        value_range = params['max'] - params['min']
+        params['range'] = np.where(value_range > 1e-07, value_range, 1.0)
     elif method == 'robust':
-        params['median'] = np.median(X, axis=0).tolist()
-        q25 = np.percentile(X, 25, axis=0)
-        q75 = np.percentile(X, 75, axis=0)
-        iqr = q75 - q25
-        params['iqr'] = [max(i, 1e-07) for i in iqr.tolist()]
-        params['q25'] = q25.tolist()
-        params['q75'] = q75.tolist()
+        q25, median, q75 = np.percentile(X, [25, 50, 75], axis=0)
+        params['median'] = median
+        params['iqr'] = np.maximum(q75 - q25, 1e-07)
+        params['q25'] = q25
+        params['q75'] = q75
     return params
 
 def export_normalization_json(params: Dict[str, Any], output_path: str) -> str:
-    with open(output_path, 'w') as f:
-        json.dump(params, f, indent=2)
+    dump_json(params, output_path)
     return output_path
 
+NORMALIZATION_ARRAYS = {'zscore': ('mean', 'std', True), 'zscore_int8': ('mean', 'std', True), 'minmax': ('min', 'range', True), 'robust': ('median', 'iqr', False)}
+
+def _c_float_array(name: str, size: str, values) -> List[str]:
+    return [f'alignas(32) const float {name}[{size}] = {{', f"    {', '.join((f'{v:.8f}f' for v in values))}", '};', '']
+
 def export_normalization_header(params: Dict[str, Any], output_path: str, prefix: str='NORM') -> str:
+    p = prefix.lower()
+    size = f'{prefix}_NUM_FEATURES'
     lines = []
     lines.append(f'// Auto-generated normalization parameters')
     lines.append(f'// Generated: {datetime.now().isoformat()}')
@@ -40,60 +54,70 @@ def export_normalization_header(params: Dict[str, Any], output_path: str, prefix
     lines.append(f'#ifndef {prefix}_PARAMS_H')
     lines.append(f'#define {prefix}_PARAMS_H')
     lines.append('')
+    lines.append('#ifndef __cplusplus')
+    lines.append('#include <stdalign.h>')
+    lines.append('#endif')
+    lines.append('#if defined(__AVX2__)')
+    lines.append('#include <immintrin.h>')
+    lines.append('#endif')
+    if params['method'] == 'zscore_int8':
+        lines.append('#include <math.h>')
+        lines.append('#include <stdint.h>')
+    lines.append('')
     lines.append(f"#define {prefix}_NUM_FEATURES {params['n_features']}")
     lines.append(f'''#define {prefix}_METHOD "{params['method']}"''')
     lines.append('')
-    if params['method'] == 'zscore':
-        lines.append(f'const float {prefix.lower()}_mean[{prefix}_NUM_FEATURES] = {{')
-        lines.append(f"    {', '.join((f'{v:.8f}f' for v in params['mean']))}")
-        lines.append('};')
-        lines.append('')
-        lines.append(f'const float {prefix.lower()}_std[{prefix}_NUM_FEATURES] = {{')
-        lines.append(f"    {', '.join((f'{v:.8f}f' for v in params['std']))}")
-        lines.append('};')
-        lines.append('')
-        lines.append(f'inline float {prefix.lower()}_normalize(float value, int feature_idx) {{')
-        lines.append(f'    return (value - {prefix.lower()}_mean[feature_idx]) / {prefix.lower()}_std[feature_idx];')
+    if params['method'] in NORMALIZATION_ARRAYS:
+        offset, scale, invertible = NORMALIZATION_ARRAYS[params['method']]
+        lines.extend(_c_float_array(f'{p}_{offset}', size, params[offset]))
+        lines.extend(_c_float_array(f'{p}_{scale}', size, params[scale]))
+        lines.extend(_c_float_array(f'{p}_inv_{scale}', size, 1.0 / np.asarray(params[scale], dtype=np.float64)))
+        lines.append(f'inline float {p}_normalize(float value, int feature_idx) {{')
+        lines.append(f'    return (value - {p}_{offset}[feature_idx]) * {p}_inv_{scale}[feature_idx];')
         lines.append('}')
+        if invertible:
+            lines.append('')
+            lines.append(f'inline float {p}_denormalize(float value, int feature_idx) {{')
+            lines.append(f'    return value * {p}_{scale}[feature_idx] + {p}_{offset}[feature_idx];')
+            lines.append('}')
         lines.append('')
-        lines.append(f'inline float {prefix.lower()}_denormalize(float value, int feature_idx) {{')
-        lines.append(f'    return value * {prefix.lower()}_std[feature_idx] + {prefix.lower()}_mean[feature_idx];')
+        lines.append(f'inline void {p}_normalize_batch(const float* input, float* output, int n_features) {{')
+        lines.append('    int i = 0;')
+        lines.append('#if defined(__AVX2__)')
+        lines.append('    for (; i + 8 <= n_features; i += 8) {')
+        lines.append(f'        __m256 centered = _mm256_sub_ps(_mm256_loadu_ps(input + i), _mm256_load_ps({p}_{offset} + i));')
+        lines.append(f'        _mm256_storeu_ps(output + i, _mm256_mul_ps(centered, _mm256_load_ps({p}_inv_{scale} + i)));')
+        lines.append('    }')
+        lines.append('#endif')
+        lines.append('#pragma GCC ivdep')
+        lines.append('    for (; i < n_features; i++) {')
+        lines.append(f'        output[i] = (input[i] - {p}_{offset}[i]) * {p}_inv_{scale}[i];')
+        lines.append('    }')
         lines.append('}')
-    elif params['method'] == 'minmax':
-        lines.append(f'const float {prefix.lower()}_min[{prefix}_NUM_FEATURES] = {{')
-        lines.append(f"    {', '.join((f'{v:.8f}f' for v in params['min']))}")
-        lines.append('};')
-        lines.append('')
-        lines.append(f'const float {prefix.lower()}_range[{prefix}_NUM_FEATURES] = {{')
-        lines.append(f"    {', '.join((f'{v:.8f}f' for v in params['range']))}")
-        lines.append('};')
-        lines.append('')
-        lines.append(f'inline float {prefix.lower()}_normalize(float value, int feature_idx) {{')
-        lines.append(f'    return (value - {prefix.lower()}_min[feature_idx]) / {prefix.lower()}_range[feature_idx];')
-        lines.append('}')
-        lines.append('')
-        lines.append(f'inline float {prefix.lower()}_denormalize(float value, int feature_idx) {{')
-        lines.append(f'    return value * {prefix.lower()}_range[feature_idx] + {prefix.lower()}_min[feature_idx];')
-        lines.append('}')
-    elif params['method'] == 'robust':
-        lines.append(f'const float {prefix.lower()}_median[{prefix}_NUM_FEATURES] = {{')
-        lines.append(f"    {', '.join((f'{v:.8f}f' for v in params['median']))}")
-        lines.append('};')
-        lines.append('')
-        lines.append(f'const float {prefix.lower()}_iqr[{prefix}_NUM_FEATURES] = {{')
-        lines.append(f"    {', '.join((f'{v:.8f}f' for v in params['iqr']))}")
-        lines.append('};')
-        lines.append('')
-        lines.append(f'inline float {prefix.lower()}_normalize(float value, int feature_idx) {{')
-        lines.append(f'    return (value - {prefix.lower()}_median[feature_idx]) / {prefix.lower()}_iqr[feature_idx];')
+        if params['method'] == 'zscore_int8':
+            lines.append('')
+            lines.append(f"#define {prefix}_INPUT_SCALE {params['input_scale']}f")
+            lines.append(f"#define {prefix}_INPUT_ZERO_POINT {params['input_zero_point']}")
+            lines.append('')
+            lines.extend(_c_float_array(f'{p}_quant_mul', size, params['quant_mul']))
+            lines.extend(_c_float_array(f'{p}_quant_bias', size, params['quant_bias']))
+            lines.append(f'inline int8_t {p}_quantize(float value, int feature_idx) {{')
+            lines.append(f'    int32_t q = (int32_t)lrintf(value * {p}_quant_mul[feature_idx] + {p}_quant_bias[feature_idx]);')
+            lines.append('    return (int8_t)(q < -128 ? -128 : (q > 127 ? 127 : q));')
+            lines.append('}')
+            lines.append('')
+            lines.append(f'inline void {p}_quantize_batch(const float* input, int8_t* output, int n_features) {{')
+            lines.append('    for (int i = 0; i < n_features; i++) {')
+            lines.append(f'        output[i] = {p}_quantize(input[i], i);')
+            lines.append('    }')
+            lines.append('}')
+    else:
+        lines.append(f'inline void {p}_normalize_batch(const float* input, float* output, int n_features) {{')
+        lines.append('    for (int i = 0; i < n_features; i++) {')
+        lines.append(f'        output[i] = {p}_normalize(input[i], i);')
+        lines.append('    }')
         lines.append('}')
     lines.append('')
-    lines.append(f'inline void {prefix.lower()}_normalize_batch(const float* input, float* output, int n_features) {{')
-    lines.append('    for (int i = 0; i < n_features; i++) {')
-    lines.append(f'        output[i] = {prefix.lower()}_normalize(input[i], i);')
-    lines.append('    }')
-    lines.append('}')
-    lines.append('')
     lines.append('// Feature names:')
     for i, name in enumerate(params.get('feature_names', [])):
         lines.append(f'//   [{i}] {name}')
@@ -134,8 +158,16 @@ def generate_feature_config(feature_names: List[str], normalization_params: Dict
 
 class NormalizationExporter:
 
-    def __init__(self, X_train: np.ndarray, feature_names: List[str]=None, method: str='zscore'):
-        self.params = compute_normalization_params(X_train, feature_names, method)
+    def __init__(self, X_train: np.ndarray, feature_names: List[str]=None, method: str='zscore', quant_stats: Dict[str, Any]=None):
+        self.params = compute_normalization_params(X_train, feature_names, method, quant_stats)
+        self._arrays = None
+        if method in NORMALIZATION_ARRAYS:
+            offset, scale, _ = NORMALIZATION_ARRAYS[method]
+            scale_values = np.asarray(self.params[scale], dtype=np.float64)
+            self._arrays = (np.asarray(self.params[offset], dtype=np.float64), scale_values, 1.0 / scale_values)
+        if method == 'zscore_int8':
+            self._quant_mul = np.asarray(self.params['quant_mul'], dtype=np.float64)
+            self._quant_bias = np.asarray(self.params['quant_bias'], dtype=np.float64)
 
     def export_all(self, output_dir: str, prefix: str='norm') -> Dict[str, str]:
         import os
@@ -156,31 +188,28 @@ class NormalizationExporter:
         return outputs
 
     def normalize(self, X: np.ndarray) -> np.ndarray:
-        if self.params['method'] == 'zscore':
-            mean = np.array(self.params['mean'])
-            std = np.array(self.params['std'])
-            return (X - mean) / std
-        elif self.params['method'] == 'minmax':
-            min_val = np.array(self.params['min'])
-            range_val = np.array(self.params['range'])
-            return (X - min_val) / range_val
-        elif self.params['method'] == 'robust':
-            median = np.array(self.params['median'])
-            iqr = np.array(self.params['iqr'])
-            return (X - median) / iqr
-        return X
+        if self._arrays is None:
+            return X
+        offset, _, inv_scale = self._arrays
+        out = affine_rows(X, offset, inv_scale)
+        if out is not None:
+            return out
+        out = np.subtract(X, offset)
+        out *= inv_scale
+        return out
+
+    def quantize(self, X: np.ndarray) -> np.ndarray:
+        if self.params['method'] != 'zscore_int8':
+            raise ValueError('quantize requires the zscore_int8 method')
+        q = np.multiply(X, self._quant_mul)
+        q += self._quant_bias
+        np.rint(q, out=q)
+        return np.clip(q, -128, 127, out=q).astype(np.int8)
 
     def denormalize(self, X: np.ndarray) -> np.ndarray:
-        if self.params['method'] == 'zscore':
-            mean = np.array(self.params['mean'])
-            std = np.array(self.params['std'])
-            return X * std + mean
-        elif self.params['method'] == 'minmax':
-            min_val = np.array(self.params['min'])
-            range_val = np.array(self.params['range'])
-            return X * range_val + min_val
-        elif self.params['method'] == 'robust':
-            median = np.array(self.params['median'])
-            iqr = np.array(self.params['iqr'])
-            return X * iqr + median
-        return X
\ No newline at end of file
+        if self._arrays is None:
+            return X
+        offset, scale, _ = self._arrays
+        out = np.multiply(X, scale)
+        out += offset
+        return out
\ No newline at end of file
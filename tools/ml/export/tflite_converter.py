@@ -1,8 +1,9 @@
 import numpy as np
 from typing import Optional, Callable, Dict, Any, List
 from datetime import datetime
-import json
 import os
+import mmap
+from .json_io import dump_json
 
 def convert_to_tflite(model, output_path: str, quantization: str='int8', representative_data: np.ndarray=None, metadata: Dict[str, Any]=None) -> Dict[str, Any]:
     import tensorflow as tf
@@ -33,7 +34,7 @@ def convert_to_tflite(model, output_path: str, quantization: str='int8', represe
     with open(output_path, 'wb') as f:
         f.write(tflite_model)
     stats = {'output_path': output_path, 'size_bytes': len(tflite_model), 'size_kb': len(tflite_model) / 1024, 'quantization': quantization, 'timestamp': datetime.now().isoformat()}
-    interpreter = tf.lite.Interpreter(model_content=tflite_model)
+    interpreter = tf.lite.Interpreter(model_path=output_path)
     interpreter.allocate_tensors()
     input_details = interpreter.get_input_details()[0]
     output_details = interpreter.get_output_details()[0]
@@ -49,10 +50,24 @@ def convert_to_tflite(model, output_path: str, quantization: str='int8', represe
         stats['output_zero_point'] = int(output_details['quantization'][1])
     return stats
 
+HEX_BYTES_PER_LINE = 16
+HEX_CHUNK_SIZE = 1 << 16
+
+def _write_hex_rows(f, data, bytes_per_line: int=HEX_BYTES_PER_LINE, indent: str='    ') -> None:
+    size = len(data)
+    row_chars = 6 * bytes_per_line
+    step = HEX_CHUNK_SIZE - HEX_CHUNK_SIZE % bytes_per_line
+    for offset in range(0, size, step):
+        hex_text = '0x' + data[offset:offset + step].hex(',').replace(',', ', 0x')
+        last = len(hex_text) - row_chars + 2 if offset + step >= size else len(hex_text)
+        for start in range(0, len(hex_text), row_chars):
+            f.write(indent)
+            f.write(hex_text[start:start + row_chars - 2])
+            f.write(',\n' if start < last else '\n')
+
 def generate_c_header(tflite_path: str, header_path: str, model_name: str='fault_model', include_metadata: bool=True, metadata: Dict[str, Any]=None) -> str:
     import tensorflow as tf
-    with open(tflite_path, 'rb') as f:
-        model_data = f.read()
+    model_size = os.path.getsize(tflite_path)
     interpreter = tf.lite.Interpreter(model_path=tflite_path)
     interpreter.allocate_tensors()
     input_details = interpreter.get_input_details()[0]
@@ -60,7 +75,7 @@ def generate_c_header(tflite_path: str, header_path: str, model_name: str='fault
     lines = []
     lines.append(f'// Auto-generated TFLite model header')
     lines.append(f'// Generated: {datetime.now().isoformat()}')
-    lines.append(f'// Model size: {len(model_data)} bytes ({len(model_data) / 1024:.1f} KB)')
+    lines.append(f'// Model size: {model_size} bytes ({model_size / 1024:.1f} KB)')
     lines.append(f'//')
     lines.append(f"// Input shape:  {list(input_details['shape'])}")
     lines.append(f"// Input dtype:  {input_details['dtype']}")
@@ -80,17 +95,12 @@ def generate_c_header(tflite_path: str, header_path: str, model_name: str='fault
     lines.append('')
     lines.append('#include <stdint.h>')
     lines.append('')
-    lines.append(f'const unsigned int {model_name}_len = {len(model_data)};')
+    lines.append(f'const unsigned int {model_name}_len = {model_size};')
     lines.append('')
     lines.append(f'alignas(8) const unsigned char {model_name}_data[] = {{')
-    bytes_per_line = 16
-    for i in range(0, len(model_data), bytes_per_line):
-        chunk = model_data[i:i + bytes_per_line]
-        hex_values = ', '.join((f'0x{b:02x}' for b in chunk))
-        comma = ',' if i + bytes_per_line < len(model_data) else ''
-        lines.append(f'    {hex_values}{comma}')
-    lines.append('};')
     lines.append('')
+    preamble = '\n'.join(lines)
+    lines = ['};', '']
     lines.append(f"#define {model_name.upper()}_INPUT_SIZE {np.prod(input_details['shape'])}")
     lines.append(f"#define {model_name.upper()}_OUTPUT_SIZE {np.prod(output_details['shape'])}")
     if 'quantization' in input_details:
@@ -104,9 +114,12 @@ def generate_c_header(tflite_path: str, header_path: str, model_name: str='fault
     lines.append('')
     lines.append(f'#endif // {model_name.upper()}_H')
     lines.append('')
-    header_content = '\n'.join(lines)
-    with open(header_path, 'w') as f:
-        f.write(header_content)
+    with open(header_path, 'w', buffering=1 << 20) as f, open(tflite_path, 'rb') as model_file:
+        f.write(preamble)
+        if model_size:
+            with mmap.mmap(model_file.fileno(), 0, access=mmap.ACCESS_READ) as model_data:
+                _write_hex_rows(f, model_data)
+        f.write('\n'.join(lines))
     return header_path
 
 def analyze_tflite_model(tflite_path: str) -> Dict[str, Any]:
@@ -133,30 +146,37 @@ def analyze_tflite_model(tflite_path: str) -> Dict[str, Any]:
     analysis['output_details'] = interpreter.get_output_details()
     return analysis
 
+_QDTYPE_RANGES = {np.int8: (-128, 127), np.uint8: (0, 255)}
+
+def _quantize_input(x: np.ndarray, quantization, dtype) -> np.ndarray:
+    scale, zero = quantization
+    lo, hi = _QDTYPE_RANGES[dtype]
+    q = np.multiply(x, np.float32(1.0 / scale), dtype=np.float32)
+    q += zero
+    np.rint(q, out=q)
+    np.clip(q, lo, hi, out=q)
+    return q.astype(dtype, copy=False)
+
 def validate_tflite_model(tflite_path: str, test_input: np.ndarray, expected_output: np.ndarray=None, tolerance: float=0.01) -> Dict[str, Any]:
     import tensorflow as tf
     interpreter = tf.lite.Interpreter(model_path=tflite_path)
     interpreter.allocate_tensors()
     input_details = interpreter.get_input_details()[0]
     output_details = interpreter.get_output_details()[0]
-    input_data = test_input.astype(np.float32)
+    input_data = np.asarray(test_input, dtype=np.float32)
     expected_shape = input_details['shape']
-    if len(input_data.shape) < len(expected_shape):
-        input_data = input_data[np.newaxis, ...]
-    if len(input_data.shape) < len(expected_shape):
-        input_data = input_data[..., np.newaxis]
-    if input_details['dtype'] == np.int8:
-        scale, zero = input_details['quantization']
-        input_data = (input_data / scale + zero).astype(np.int8)
-    elif input_details['dtype'] == np.uint8:
-        scale, zero = input_details['quantization']
-        input_data = (input_data / scale + zero).astype(np.uint8)
+    if input_data.ndim < len(expected_shape):
+        input_data = input_data.reshape(expected_shape)
+    if input_details['dtype'] in _QDTYPE_RANGES:
+        input_data = _quantize_input(input_data, input_details['quantization'], input_details['dtype'])
     interpreter.set_tensor(input_details['index'], input_data)
     interpreter.invoke()
     output_data = interpreter.get_tensor(output_details['index'])
-    if output_details['dtype'] in [np.int8, np.uint8]:
+    if output_details['dtype'] in _QDTYPE_RANGES:
         scale, zero = output_details['quantization']
-        output_data = (output_data.astype(np.float32) - zero) * scale
+        output_data = output_data.astype(np.float32)
+        output_data -= zero
+        output_data *= scale
     result = {'input_shape': list(input_data.shape), 'output_shape': list(output_data.shape), 'output': output_data.tolist(), 'valid': True}
     if expected_output is not None:
         diff = np.abs(output_data - expected_output).max()
@@ -185,8 +205,7 @@ class TFLiteModelExporter:
         full_metadata = {'model_name': self.model_name, 'export_time': datetime.now().isoformat(), 'quantization': quantization, **stats}
         if metadata:
             full_metadata.update(metadata)
-        with open(metadata_path, 'w') as f:
-            json.dump(full_metadata, f, indent=2, default=str)
+        dump_json(full_metadata, metadata_path)
         outputs['metadata'] = metadata_path
         print(f'\nExported model:')
         print(f"  TFLite:   {tflite_path} ({stats['size_kb']:.1f} KB)")